@@ -10,6 +10,7 @@ Usage: python generate_ts_reference.py
 
 import json
 import sys
+from dataclasses import fields, is_dataclass
 from pathlib import Path
 from datetime import datetime
 
@@ -18,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from rtplan_complexity.parser import parse_rtplan
 from rtplan_complexity.metrics import calculate_plan_metrics
+from rtplan_complexity.types import ControlPointArray
 
 
 def snake_to_camel(snake_str: str) -> str:
@@ -113,8 +115,14 @@ def to_serializable(obj, convert_keys=True):
     """
     if isinstance(obj, datetime):
         return obj.isoformat()
-    elif hasattr(obj, '__dict__'):
-        d = vars(obj).copy()
+    elif isinstance(obj, ControlPointArray):
+        return to_serializable(obj.to_list(), convert_keys=convert_keys)
+    elif is_dataclass(obj) or hasattr(obj, '__dict__'):
+        # Slotted dataclasses (e.g. PlanMetrics) have no instance __dict__
+        if is_dataclass(obj):
+            d = {f.name: getattr(obj, f.name) for f in fields(obj)}
+        else:
+            d = vars(obj).copy()
         result = {}
         for k, v in d.items():
             # Convert snake_case key to camelCase if needed
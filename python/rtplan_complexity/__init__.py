@@ -46,6 +46,7 @@ from .types import (
     BeamMetrics,
     PlanMetrics,
     ControlPointMetrics,
+    ControlPointArray,
     MachineDeliveryParams,
     Technique,
     ExtendedStatistics,
@@ -71,6 +72,7 @@ __all__ = [
     "BeamMetrics",
     "PlanMetrics",
     "ControlPointMetrics",
+    "ControlPointArray",
     "MachineDeliveryParams",
     "Technique",
     "ExtendedStatistics",
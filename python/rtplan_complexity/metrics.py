@@ -11,9 +11,11 @@ See docs/ALGORITHMS.md for detailed algorithm descriptions.
 """
 
 import math
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
+import shapely
 from shapely.geometry import Polygon
 from shapely.ops import unary_union
 
@@ -24,6 +26,7 @@ from .types import (
     PlanMetrics,
     BeamMetrics,
     ControlPointMetrics,
+    ControlPointArray,
     MLCLeafPositions,
     JawPositions,
     MachineDeliveryParams,
@@ -561,7 +564,7 @@ def _cumulative_arc_span(beam: Beam) -> float:
 
 def _estimate_beam_delivery_time(
     beam: Beam,
-    control_point_metrics: List[ControlPointMetrics],
+    control_point_metrics: ControlPointArray,
     machine_params: MachineDeliveryParams
 ) -> Tuple[float, str, float, float, Optional[float]]:
     """
@@ -621,6 +624,8 @@ def calculate_beam_metrics(
     machine_params: Optional[MachineDeliveryParams] = None,
     structure: Optional[Structure] = None,
     couch_angle: float = 0.0,
+    aperture_cache: Optional[Dict[Tuple[int, int], Optional[Polygon]]] = None,
+    target_cache: Optional[Dict[Tuple[float, float], Optional[Polygon]]] = None,
 ) -> BeamMetrics:
     """
     Calculate comprehensive beam-level complexity metrics.
@@ -652,6 +657,10 @@ def calculate_beam_metrics(
         machine_params: Machine delivery constraints (dose rate, gantry/MLC speeds)
         structure: Optional target structure for BAM calculation
         couch_angle: Patient support angle in degrees (default: 0.0)
+        aperture_cache: Optional dict of BEV aperture polygons, reused
+            across calls for the same plan (see calculate_plan_metrics)
+        target_cache: Optional dict of target BEV polygons for structure,
+            reused across the beams of a plan
     
     Returns:
         BeamMetrics object with all calculated metrics
@@ -669,12 +678,15 @@ def calculate_beam_metrics(
     n_ca = n_cps - 1
     
     # ===== Per-CP metrics (for UI display and delivery time estimation) =====
-    control_point_metrics: List[ControlPointMetrics] = []
+    control_point_metrics = ControlPointArray.empty(n_cps)
     for i, cp in enumerate(beam.control_points):
         prev_cp = beam.control_points[i - 1] if i > 0 else None
-        control_point_metrics.append(
-            calculate_control_point_metrics(cp, prev_cp, beam.mlc_leaf_widths)
+        control_point_metrics.set(
+            i, calculate_control_point_metrics(cp, prev_cp, beam.mlc_leaf_widths)
         )
+    cp_weights = control_point_metrics.meterset_weight
+    cp_areas = control_point_metrics.aperture_area
+    cp_perimeters = np.nan_to_num(control_point_metrics.aperture_perimeter)
     
     # ===== CA-based UCoMx metrics =====
     # For electron beams: Initialize MLC-based metrics as None (electrons use fixed applicators, not MLCs)
@@ -765,15 +777,15 @@ def calculate_beam_metrics(
     weighted_bjar = 0.0
     total_meterset_weight = 0.0
     
-    for i, cpm in enumerate(control_point_metrics):
-        cp = beam.control_points[i]
-        weight = cpm.meterset_weight
+    for i, cp in enumerate(beam.control_points):
+        weight = float(cp_weights[i])
+        aperture_area = float(cp_areas[i])
         total_meterset_weight += weight
         
         lg = calculate_leaf_gap(cp.mlc_positions)
         mad = calculate_mad(cp.mlc_positions, cp.jaw_positions)
-        perimeter = cpm.aperture_perimeter or 0
-        efs = calculate_efs(cpm.aperture_area, perimeter)
+        perimeter = float(cp_perimeters[i])
+        efs = calculate_efs(aperture_area, perimeter)
         tg = calculate_tongue_and_groove(cp.mlc_positions, beam.mlc_leaf_widths)
         jaw_area = calculate_jaw_area(cp.jaw_positions)
         
@@ -787,15 +799,14 @@ def calculate_beam_metrics(
             )
             weighted_pi += ai * weight
             # Per-CP Edge Metric: P / (2A), ComplexityCalc definition
-            cp_area = cpm.aperture_area
-            cp_em = perimeter / (2 * cp_area) if cp_area > 0 else 0.0
+            cp_em = perimeter / (2 * aperture_area) if aperture_area > 0 else 0.0
             weighted_em += cp_em * weight
         
-        if cpm.aperture_area > 0:
-            total_area += cpm.aperture_area
+        if aperture_area > 0:
+            total_area += aperture_area
             total_perimeter += perimeter
             area_count += 1
-            if cpm.aperture_area < 400:
+            if aperture_area < 400:
                 small_field_count += 1
         
         total_jaw_area += jaw_area
@@ -812,7 +823,7 @@ def calculate_beam_metrics(
             weighted_sas20 += sas20_frac * weight
             # BJAR: aperture area / jaw area (both mm²), MU-weighted
             if jaw_area > 0:
-                weighted_bjar += (cpm.aperture_area / jaw_area) * weight
+                weighted_bjar += (aperture_area / jaw_area) * weight
     
     # ===== CA-based UCoMX metrics calculation - only for photon beams (electrons have no MLCs) =====
     if not is_electron and n_ca > 0:
@@ -998,8 +1009,7 @@ def calculate_beam_metrics(
         segment_gantry_speeds: List[float] = []
         
         for i in range(1, len(beam.control_points)):
-            cpm = control_point_metrics[i]
-            segment_mu = cpm.meterset_weight * beam_mu
+            segment_mu = float(cp_weights[i]) * beam_mu
             gantry_diff = abs(
                 beam.control_points[i].gantry_angle - 
                 beam.control_points[i - 1].gantry_angle
@@ -1029,11 +1039,9 @@ def calculate_beam_metrics(
     # MD - Modulation Degree
     MD: Optional[float] = None
     if len(control_point_metrics) > 1:
-        meterset_weights = [cpm.meterset_weight for cpm in control_point_metrics]
-        avg_weight = sum(meterset_weights) / len(meterset_weights)
+        avg_weight = float(cp_weights.mean())
         if avg_weight > 0:
-            variance = sum((w - avg_weight) ** 2 for w in meterset_weights) / len(meterset_weights)
-            MD = math.sqrt(variance) / avg_weight
+            MD = float(cp_weights.std()) / avg_weight
     
     # MI - Modulation Index
     MI: Optional[float] = None
@@ -1044,7 +1052,7 @@ def calculate_beam_metrics(
     # BAM - Beam Aperture Modulation (if structure provided)
     BAM: Optional[float] = None
     if structure is not None:
-        BAM = calculate_pam_beam(structure, beam, couch_angle)
+        BAM = calculate_pam_beam(structure, beam, couch_angle, aperture_cache, target_cache)
     
     return BeamMetrics(
         beam_number=beam.beam_number,
@@ -1117,6 +1125,7 @@ def calculate_plan_metrics(
     plan: RTPlan,
     machine_params: Optional[MachineDeliveryParams] = None,
     structure: Optional[Structure] = None,
+    aperture_cache: Optional[Dict[Tuple[int, int], Optional[Polygon]]] = None,
 ) -> PlanMetrics:
     """
     Calculate plan-level complexity metrics aggregated from all beams.
@@ -1135,12 +1144,21 @@ def calculate_plan_metrics(
         plan: RTPlan object with beam data
         machine_params: Machine delivery constraints
         structure: Optional target structure for PAM calculation
+        aperture_cache: Optional dict holding BEV aperture polygons keyed by
+            (beam number, CP index). Pass the same dict when evaluating one
+            plan against several structures so that only the target
+            projection and intersection are recomputed per structure.
     
     Returns:
         PlanMetrics object with aggregated metrics and beam-level breakdown
     """
+    # Target projections are shared by all beams for this structure
+    target_cache: Dict[Tuple[float, float], Optional[Polygon]] = {}
     beam_metrics = [
-        calculate_beam_metrics(beam, machine_params, structure)
+        calculate_beam_metrics(
+            beam, machine_params, structure,
+            aperture_cache=aperture_cache, target_cache=target_cache,
+        )
         for beam in plan.beams
     ]
     
@@ -1288,13 +1306,33 @@ def calculate_plan_metrics(
 # Plan Aperture Modulation (PAM) Functions
 # ============================================================================
 
+# Exact (sin, cos) at the cardinal gantry angles, where math.sin/cos of the
+# radian value leave ~1e-16 residues (e.g. cos(90°) = 6.1e-17)
+_CARDINAL_SINCOS = {
+    0.0: (0.0, 1.0),
+    90.0: (1.0, 0.0),
+    180.0: (0.0, -1.0),
+    270.0: (-1.0, 0.0),
+}
+
+
+@lru_cache(maxsize=512)
+def _sincos(angle_deg: float) -> Tuple[float, float]:
+    """(sin, cos) of an angle in degrees; control points often repeat angles."""
+    cardinal = _CARDINAL_SINCOS.get(angle_deg % 360.0)
+    if cardinal is not None:
+        return cardinal
+    angle_rad = math.radians(angle_deg)
+    return math.sin(angle_rad), math.cos(angle_rad)
+
+
 def project_point_to_bev(
-    point_3d: Tuple[float, float, float],
+    point_3d: Union[Tuple[float, float, float], np.ndarray],
     gantry_angle_deg: float,
     couch_angle_deg: float = 0.0,
-) -> Tuple[float, float]:
+) -> Union[Tuple[float, float], np.ndarray]:
     """
-    Project a 3D patient point to the 2D Beam's Eye View (BEV) plane.
+    Project 3D patient points to the 2D Beam's Eye View (BEV) plane.
     
     The BEV coordinate system is defined with origin at isocenter:
     - X-axis (horizontal): perpendicular to gantry rotation, positive to right
@@ -1302,22 +1340,28 @@ def project_point_to_bev(
     - Z-axis (along beam): positive from target toward gantry
     
     Args:
-        point_3d: (x, y, z) patient coordinates (mm), at isocenter z=0
+        point_3d: (x, y, z) patient coordinates (mm), at isocenter z=0,
+            or an (N, 3) array of such points
         gantry_angle_deg: Gantry angle in degrees (0-360)
         couch_angle_deg: Couch angle in degrees (not yet implemented)
     
     Returns:
-        (x_bev, y_bev): 2D BEV coordinates in mm
+        (x_bev, y_bev): 2D BEV coordinates in mm, or an (N, 2) array for
+        array input
     """
-    x, y, z = point_3d
-    
-    # Convert angles to radians
-    gantry_rad = math.radians(gantry_angle_deg)
+    sin_a, cos_a = _sincos(gantry_angle_deg)
     
     # Rotate around Y-axis by gantry angle (BEV projection plane is perpendicular to beam)
     # After rotation: X stays same (horizontal), Y stays same (vertical)
     # Z component maps to BEV X (depth direction)
-    x_bev = z * math.sin(gantry_rad) + x * math.cos(gantry_rad)
+    if isinstance(point_3d, np.ndarray) and point_3d.ndim == 2:
+        bev = np.empty((len(point_3d), 2))
+        bev[:, 0] = point_3d[:, 2] * sin_a + point_3d[:, 0] * cos_a
+        bev[:, 1] = point_3d[:, 1]
+        return bev
+    
+    x, y, z = point_3d
+    x_bev = z * sin_a + x * cos_a
     y_bev = y
     
     return (x_bev, y_bev)
@@ -1345,11 +1389,10 @@ def contour_to_bev_polygon(
     if not contour_points_3d or len(contour_points_3d) < 3:
         return None
     
-    # Project all points to BEV
-    bev_points = [
-        project_point_to_bev(pt, gantry_angle_deg, couch_angle_deg)
-        for pt in contour_points_3d
-    ]
+    # Project all points to BEV in one pass
+    bev_points = project_point_to_bev(
+        np.asarray(contour_points_3d, dtype=np.float64), gantry_angle_deg, couch_angle_deg
+    )
     
     try:
         # Create polygon (Shapely automatically handles orientation)
@@ -1369,6 +1412,40 @@ def contour_to_bev_polygon(
     return None
 
 
+def _leaf_strip_outline(
+    x_left: np.ndarray,
+    x_right: np.ndarray,
+    y_lower: np.ndarray,
+    y_upper: np.ndarray,
+) -> Optional[Polygon]:
+    """
+    Outline of stacked leaf-strip rectangles, or None if they do not form one
+    connected staircase.
+    
+    When every strip starts where the previous one ends and overlaps it in X,
+    the union is the polygon running up the right edges and back down the left
+    edges, so no GEOS union is needed.
+    """
+    if not np.array_equal(y_upper[:-1], y_lower[1:]):
+        return None
+    if not np.all(np.maximum(x_left[:-1], x_left[1:]) < np.minimum(x_right[:-1], x_right[1:])):
+        return None
+    
+    m = len(x_left)
+    ring = np.empty((4 * m, 2))
+    # Up the right side: (right, lower), (right, upper) per strip
+    ring[0:2 * m:2, 0] = x_right
+    ring[1:2 * m:2, 0] = x_right
+    ring[0:2 * m:2, 1] = y_lower
+    ring[1:2 * m:2, 1] = y_upper
+    # Down the left side: (left, upper), (left, lower) per strip, top first
+    ring[2 * m::2, 0] = x_left[::-1]
+    ring[2 * m + 1::2, 0] = x_left[::-1]
+    ring[2 * m::2, 1] = y_upper[::-1]
+    ring[2 * m + 1::2, 1] = y_lower[::-1]
+    return shapely.polygons(ring)
+
+
 def get_aperture_polygon(
     mlc_positions: MLCLeafPositions,
     jaw_positions: JawPositions,
@@ -1384,10 +1461,12 @@ def get_aperture_polygon(
     Args:
         mlc_positions: MLC leaf positions for both banks
         jaw_positions: X and Y jaw positions
-        leaf_boundaries: Leaf Y-boundaries (N+1 values for N leaf pairs)
+        leaf_boundaries: Leaf Y-boundaries (N+1 values for N leaf pairs),
+            as a list or float array
     
     Returns:
         Shapely Polygon representing aperture, or None if aperture is empty
+        (open area below 1e-6 mm²)
     """
     try:
         # X-axis aperture: between jaw_x1 and jaw_x2
@@ -1398,48 +1477,47 @@ def get_aperture_polygon(
         y_min = jaw_positions.y1
         y_max = jaw_positions.y2
         
-        # Collect all aperture rectangles from active leaves
-        aperture_rects = []
+        # Leaf-pair rectangles for all pairs at once, clipped to the jaws
         n_pairs = min(len(mlc_positions.bank_a), len(mlc_positions.bank_b), len(leaf_boundaries) - 1)
+        bounds = np.asarray(leaf_boundaries[:n_pairs + 1], dtype=np.float64)
+        y_lower = np.maximum(bounds[:-1], y_min)
+        y_upper = np.minimum(bounds[1:], y_max)
+        x_left = np.maximum(mlc_positions.bank_a_np[:n_pairs], x_min)
+        x_right = np.minimum(mlc_positions.bank_b_np[:n_pairs], x_max)
         
-        for k in range(n_pairs):
-            y_lower = leaf_boundaries[k]
-            y_upper = leaf_boundaries[k + 1]
-            
-            # Skip leaves fully outside jaw opening
-            if y_upper < y_min or y_lower > y_max:
-                continue
-            
-            # Clip leaf opening to jaw Y boundaries
-            y_lower_clipped = max(y_lower, y_min)
-            y_upper_clipped = min(y_upper, y_max)
-            
-            # Leaf opening in X direction
-            x_left = mlc_positions.bank_a[k]
-            x_right = mlc_positions.bank_b[k]
-            
-            # Clip to jaw X boundaries
-            x_left_clipped = max(x_left, x_min)
-            x_right_clipped = min(x_right, x_max)
-            
-            # If valid opening, add rectangle
-            if x_left_clipped < x_right_clipped and y_lower_clipped < y_upper_clipped:
-                rect = Polygon([
-                    (x_left_clipped, y_lower_clipped),
-                    (x_right_clipped, y_lower_clipped),
-                    (x_right_clipped, y_upper_clipped),
-                    (x_left_clipped, y_upper_clipped),
-                ])
-                aperture_rects.append(rect)
+        # Keep only open pairs (this also drops pairs outside the Y jaws)
+        is_open = (x_left < x_right) & (y_lower < y_upper)
+        if not is_open.any():
+            return None
+        x_left, x_right = x_left[is_open], x_right[is_open]
+        y_lower, y_upper = y_lower[is_open], y_upper[is_open]
         
-        if not aperture_rects:
+        # Leaf strips do not overlap, so the open area is a plain sum; a
+        # negligible opening is treated as closed (as AM does) without
+        # building any geometry
+        if np.sum((x_right - x_left) * (y_upper - y_lower)) < 1e-6:
             return None
         
-        # Union all rectangles into single aperture polygon
-        if len(aperture_rects) == 1:
-            aperture_poly = aperture_rects[0]
-        else:
-            aperture_poly = unary_union(aperture_rects)
+        # A connected staircase of strips is outlined directly
+        aperture_poly = None
+        if len(x_left) > 1:
+            aperture_poly = _leaf_strip_outline(x_left, x_right, y_lower, y_upper)
+        
+        if aperture_poly is None:
+            # Corners (left, lower), (right, lower), (right, upper), (left, upper),
+            # written straight into one buffer
+            corners = np.empty((len(x_left), 4, 2))
+            corners[:, (0, 3), 0] = x_left[:, None]
+            corners[:, (1, 2), 0] = x_right[:, None]
+            corners[:, (0, 1), 1] = y_lower[:, None]
+            corners[:, (2, 3), 1] = y_upper[:, None]
+            aperture_rects = shapely.polygons(corners)
+            
+            # Union all rectangles into single aperture polygon
+            if len(aperture_rects) == 1:
+                aperture_poly = aperture_rects[0]
+            else:
+                aperture_poly = unary_union(aperture_rects)
         
         return aperture_poly if isinstance(aperture_poly, Polygon) else None
     
@@ -1447,6 +1525,17 @@ def get_aperture_polygon(
         return None
 
 
+def _axis_aligned_box(polygon: Polygon) -> Optional[Tuple[float, float, float, float]]:
+    """Bounds of polygon if it is an axis-aligned rectangle, else None."""
+    # A hole-free quadrilateral has 5 coordinates (closed ring)
+    if shapely.get_num_coordinates(polygon) != 5:
+        return None
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3), _ = shapely.get_coordinates(polygon).tolist()
+    if (x0 == x1 and y1 == y2 and x2 == x3 and y3 == y0) or (y0 == y1 and x1 == x2 and y2 == y3 and x3 == x0):
+        return min(x0, x2), min(y0, y2), max(x0, x2), max(y0, y2)
+    return None
+
+
 def calculate_aperture_modulation(
     target_polygon: Polygon,
     aperture_polygon: Polygon,
@@ -1465,19 +1554,44 @@ def calculate_aperture_modulation(
     Returns:
         AM value in [0, 1]
     """
-    if not target_polygon.is_valid or target_polygon.area < 1e-6:
+    total_area = target_polygon.area
+    if not target_polygon.is_valid or total_area < 1e-6:
         return 0.0
     
     if not aperture_polygon.is_valid or aperture_polygon.area < 1e-6:
         # Aperture is empty, entire target is blocked
         return 1.0
     
+    # Disjoint bounding boxes: nothing of the target is exposed
+    t_min_x, t_min_y, t_max_x, t_max_y = target_polygon.bounds
+    a_min_x, a_min_y, a_max_x, a_max_y = aperture_polygon.bounds
+    if t_max_x <= a_min_x or a_max_x <= t_min_x or t_max_y <= a_min_y or a_max_y <= t_min_y:
+        return 1.0
+    
+    # Single-rectangle apertures (one open leaf pair or a jaw-defined field):
+    # rectangle clipping is much cheaper than a general overlay, and a target
+    # whose bounding box lies inside the rectangle is fully exposed
+    box = _axis_aligned_box(aperture_polygon)
+    if box is not None:
+        if a_min_x <= t_min_x and t_max_x <= a_max_x and a_min_y <= t_min_y and t_max_y <= a_max_y:
+            return 0.0
+        am = 1.0 - shapely.clip_by_rect(target_polygon, *box).area / total_area
+        return max(0.0, min(1.0, am))
+    
+    # The target is shared across control points (see target_cache), so
+    # prepare it once and settle the fully blocked/unblocked cases with
+    # predicates before paying for an intersection
+    shapely.prepare(target_polygon)
+    if not target_polygon.intersects(aperture_polygon):
+        return 1.0
+    if target_polygon.covered_by(aperture_polygon):
+        return 0.0
+    
     # Calculate blocked area = target - (target AND aperture)
     intersection = target_polygon.intersection(aperture_polygon)
     unblocked_area = intersection.area
-    total_area = target_polygon.area
     
-    am = 1.0 - (unblocked_area / total_area) if total_area > 0 else 1.0
+    am = 1.0 - (unblocked_area / total_area)
     
     # Clamp to [0, 1]
     return max(0.0, min(1.0, am))
@@ -1488,6 +1602,9 @@ def calculate_pam_control_point(
     beam: Beam,
     cp_index: int,
     couch_angle: float = 0.0,
+    aperture_cache: Optional[Dict[Tuple[int, int], Optional[Polygon]]] = None,
+    target_cache: Optional[Dict[Tuple[float, float], Optional[Polygon]]] = None,
+    leaf_boundaries: Optional[np.ndarray] = None,
 ) -> Optional[float]:
     """
     Calculate Aperture Modulation (AM) at a single control point.
@@ -1499,6 +1616,12 @@ def calculate_pam_control_point(
         beam: Beam containing control point
         cp_index: Index of control point in beam.control_points
         couch_angle: Couch angle in degrees
+        aperture_cache: Optional dict of aperture polygons keyed by
+            (beam number, CP index); filled on first use
+        target_cache: Optional dict of target BEV polygons for this structure,
+            keyed by (gantry angle, couch angle); filled on first use
+        leaf_boundaries: Optional float array of the beam's effective leaf
+            boundaries; derived from the beam when omitted
     
     Returns:
         AM value in [0, 1], or None if calculation fails
@@ -1508,19 +1631,38 @@ def calculate_pam_control_point(
     
     cp = beam.control_points[cp_index]
     
-    # Get all contour points from structure
-    all_contour_points = structure.get_all_points()
-    if not all_contour_points or len(all_contour_points) < 3:
-        return None
-    
-    # Create target projection polygon
-    target_poly = contour_to_bev_polygon(all_contour_points, cp.gantry_angle, couch_angle)
+    # Create target projection polygon (depends only on the beam angles here)
+    angles = (cp.gantry_angle, couch_angle)
+    if target_cache is not None and angles in target_cache:
+        target_poly = target_cache[angles]
+    else:
+        # Get all contour points from structure
+        all_contour_points = structure.get_all_points()
+        if not all_contour_points or len(all_contour_points) < 3:
+            return None
+        
+        target_poly = contour_to_bev_polygon(all_contour_points, cp.gantry_angle, couch_angle)
+        if target_cache is not None:
+            target_cache[angles] = target_poly
     if not target_poly or target_poly.area < 1e-6:
         return None
     
-    # Create aperture polygon
-    leaf_boundaries = get_effective_leaf_boundaries(beam)
-    aperture_poly = get_aperture_polygon(cp.mlc_positions, cp.jaw_positions, leaf_boundaries)
+    # Every leaf pair shut: no aperture can open, so skip building one
+    mlc = cp.mlc_positions
+    n_pairs = min(len(mlc.bank_a), len(mlc.bank_b))
+    if np.all(mlc.bank_b_np[:n_pairs] <= mlc.bank_a_np[:n_pairs]):
+        return 1.0
+    
+    # Create aperture polygon (independent of the structure, so cacheable)
+    key = (beam.beam_number, cp_index)
+    if aperture_cache is not None and key in aperture_cache:
+        aperture_poly = aperture_cache[key]
+    else:
+        if leaf_boundaries is None:
+            leaf_boundaries = get_effective_leaf_boundaries(beam)
+        aperture_poly = get_aperture_polygon(cp.mlc_positions, cp.jaw_positions, leaf_boundaries)
+        if aperture_cache is not None:
+            aperture_cache[key] = aperture_poly
     if not aperture_poly:
         # No aperture opening = fully blocked
         return 1.0
@@ -1534,6 +1676,8 @@ def calculate_pam_beam(
     structure: Structure,
     beam: Beam,
     couch_angle: float = 0.0,
+    aperture_cache: Optional[Dict[Tuple[int, int], Optional[Polygon]]] = None,
+    target_cache: Optional[Dict[Tuple[float, float], Optional[Polygon]]] = None,
 ) -> Optional[float]:
     """
     Calculate Beam Aperture Modulation (BAM) for a single beam.
@@ -1546,6 +1690,9 @@ def calculate_pam_beam(
         structure: Target structure
         beam: Beam to analyze
         couch_angle: Couch angle in degrees
+        aperture_cache: Optional dict of aperture polygons shared across calls
+        target_cache: Optional dict of target BEV polygons for this structure,
+            shared across beams (see calculate_pam_control_point)
     
     Returns:
         BAM value in [0, 1], or None if calculation fails
@@ -1556,24 +1703,29 @@ def calculate_pam_beam(
     cps = beam.control_points
     n_cps = len(cps)
     
-    # Calculate AM for each control point and accumulate weighted sum
-    total_weighted_am = 0.0
-    total_mu = 0.0
+    # Target projections by beam angles; static beams project only once
+    if target_cache is None:
+        target_cache = {}
+    # Converted once here rather than on every aperture-cache miss
+    leaf_boundaries = np.asarray(get_effective_leaf_boundaries(beam), dtype=np.float64)
     
+    # AM for each control point (NaN where it cannot be calculated)
+    ams = np.full(n_cps, np.nan)
     for i in range(n_cps):
-        am = calculate_pam_control_point(structure, beam, i, couch_angle)
-        if am is None:
-            continue
-        
-        # Get MU weight for this control point
-        # Use difference from previous CP (except for first CP which uses its own weight)
-        if i == 0:
-            delta_mu = cps[i].cumulative_meterset_weight
-        else:
-            delta_mu = cps[i].cumulative_meterset_weight - cps[i - 1].cumulative_meterset_weight
-        
-        total_weighted_am += am * delta_mu
-        total_mu += delta_mu
+        am = calculate_pam_control_point(
+            structure, beam, i, couch_angle, aperture_cache, target_cache, leaf_boundaries
+        )
+        if am is not None:
+            ams[i] = am
+    
+    # MU weight per control point: difference from the previous CP (the
+    # first CP uses its own weight)
+    cum_mu = np.fromiter((cp.cumulative_meterset_weight for cp in cps), dtype=np.float64, count=n_cps)
+    delta_mu = np.diff(cum_mu, prepend=0.0)
+    
+    valid = ~np.isnan(ams)
+    total_weighted_am = float(np.dot(ams[valid], delta_mu[valid]))
+    total_mu = float(delta_mu[valid].sum())
     
     if total_mu > 1e-6:
         bam = total_weighted_am / total_mu
@@ -1605,9 +1757,11 @@ def calculate_pam_plan(
     
     total_weighted_pam = 0.0
     total_mu = 0.0
+    # Beams often revisit the same angles (e.g. arcs in opposite directions)
+    target_cache: Dict[Tuple[float, float], Optional[Polygon]] = {}
     
     for beam in rtplan.beams:
-        bam = calculate_pam_beam(structure, beam)
+        bam = calculate_pam_beam(structure, beam, target_cache=target_cache)
         if bam is None:
             continue
         
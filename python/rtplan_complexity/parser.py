@@ -4,7 +4,10 @@ DICOM RT Plan parser matching the TypeScript implementation in src/lib/dicom/par
 Uses pydicom to parse DICOM files and extract RT Plan structure.
 """
 
+import copy
+import os
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional, Tuple
 import pydicom
 from pydicom.dataset import Dataset, FileDataset
@@ -589,12 +592,15 @@ def _anonymize_institution(raw_name: str) -> Optional[str]:
     return f"{raw_name[:3]}***"
 
 
-def parse_rtplan(file_path: str) -> RTPlan:
+def parse_rtplan(file_path: str, cache: bool = False) -> RTPlan:
     """
     Parse a DICOM RT Plan file and extract plan structure.
     
     Args:
         file_path: Path to the DICOM RT Plan file
+        cache: Reuse an earlier parse of the same unchanged file (keyed by
+            path, modification time and size). Each call still returns an
+            independent deep copy; see clear_rtplan_cache.
         
     Returns:
         RTPlan object with parsed data
@@ -603,6 +609,26 @@ def parse_rtplan(file_path: str) -> RTPlan:
         ValueError: If file is not a valid RT Plan
         FileNotFoundError: If file does not exist
     """
+    if not cache:
+        return _parse_rtplan_file(file_path)
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    return copy.deepcopy(_parse_rtplan_cached(file_path, stat.st_mtime_ns, stat.st_size))
+
+
+def clear_rtplan_cache() -> None:
+    """Drop all plans held by parse_rtplan(..., cache=True)."""
+    _parse_rtplan_cached.cache_clear()
+
+
+@lru_cache(maxsize=16)
+def _parse_rtplan_cached(file_path: str, mtime_ns: int, size: int) -> RTPlan:
+    """Parse a plan once per (path, mtime, size); see parse_rtplan."""
+    return _parse_rtplan_file(file_path)
+
+
+def _parse_rtplan_file(file_path: str) -> RTPlan:
+    """Parse a DICOM RT Plan file (uncached)."""
     ds = pydicom.dcmread(file_path)
     
     # Validate SOP Class (optional - some files may not have it)
@@ -661,7 +687,6 @@ def parse_rtplan(file_path: str) -> RTPlan:
                 beam.beam_dose = ref_beam.beam_meterset
     
     # Get file size
-    import os
     file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
     
     # Get treatment machine name from first beam
@@ -5,17 +5,24 @@ These dataclasses mirror the TypeScript types exactly to ensure
 consistent data structures between implementations.
 """
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# slots=True drops the per-instance __dict__ (Python 3.10+); on 3.9 the
+# affected dataclasses fall back to regular dict-backed instances.
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 # ============================================================================
 # Structure Types (RTSTRUCT)
 # ============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class ContourSequence:
     """A single contour from an ROI (sequence of 3D points)."""
     points: List[Tuple[float, float, float]]  # List of (x, y, z) points in patient coordinates
@@ -26,7 +33,7 @@ class ContourSequence:
             self.number_of_points = len(self.points)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Structure:
     """ROI structure from RTSTRUCT (e.g., target, OAR)."""
     name: str
@@ -58,14 +65,41 @@ class GantryDirection(Enum):
     NONE = "NONE"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MLCLeafPositions:
     """MLC leaf positions for both banks."""
     bank_a: List[float] = field(default_factory=list)  # Negative X direction
     bank_b: List[float] = field(default_factory=list)  # Positive X direction
-
-
-@dataclass
+    # (source list, array) pairs backing bank_a_np / bank_b_np
+    _np_bank_a: Optional[Tuple[List[float], np.ndarray]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _np_bank_b: Optional[Tuple[List[float], np.ndarray]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def bank_a_np(self) -> np.ndarray:
+        """bank_a as a float64 array, converted once per assigned list."""
+        return self._as_array("bank_a")
+    
+    @property
+    def bank_b_np(self) -> np.ndarray:
+        """bank_b as a float64 array, converted once per assigned list."""
+        return self._as_array("bank_b")
+    
+    def _as_array(self, name: str) -> np.ndarray:
+        # Cached next to the source list, so reassigning the bank (as the
+        # parser does) invalidates it; in-place edits of the list do not
+        source = getattr(self, name)
+        cached = getattr(self, "_np_" + name)
+        if cached is None or cached[0] is not source:
+            cached = (source, np.asarray(source, dtype=np.float64))
+            setattr(self, "_np_" + name, cached)
+        return cached[1]
+
+
+@dataclass(**_SLOTS)
 class JawPositions:
     """Jaw positions in mm."""
     x1: float = 0.0
@@ -74,7 +108,7 @@ class JawPositions:
     y2: float = 0.0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ControlPoint:
     """Control point data for a beam."""
     index: int
@@ -91,7 +125,7 @@ class ControlPoint:
     table_top_lateral: Optional[float] = None  # mm
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Beam:
     """Beam data from RT Plan."""
     beam_number: int
@@ -118,14 +152,14 @@ class Beam:
     treatment_machine_name: Optional[str] = None  # Treatment machine name per beam (DICOM 300A,00B2)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ReferencedBeam:
     """Referenced beam in a fraction group."""
     beam_number: int
     beam_meterset: float  # MU
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class FractionGroup:
     """Fraction group data."""
     fraction_group_number: int
@@ -134,7 +168,7 @@ class FractionGroup:
     referenced_beams: List[ReferencedBeam] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DoseReference:
     """DICOM Dose Reference from DoseReferenceSequence (300A,0010)."""
     dose_reference_number: int
@@ -147,7 +181,7 @@ class DoseReference:
     target_maximum_dose: Optional[float] = None  # Gy
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class RTPlan:
     """Complete RT Plan structure."""
     # Patient & Plan Identification
@@ -191,7 +225,7 @@ class RTPlan:
 # Metrics Types
 # ============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class SmallApertureFlags:
     """Flags for small aperture detection."""
     below_2mm: bool = False
@@ -200,7 +234,7 @@ class SmallApertureFlags:
     below_20mm: bool = False
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ControlPointMetrics:
     """Metrics calculated for a single control point."""
     control_point_index: int
@@ -214,7 +248,153 @@ class ControlPointMetrics:
     PAM: Optional[float] = None  # Plan Aperture Modulation (per control point)
 
 
-@dataclass
+# Bit positions of the packed SmallApertureFlags in ControlPointArray
+_FLAG_BELOW_2MM = 0b0001
+_FLAG_BELOW_5MM = 0b0010
+_FLAG_BELOW_10MM = 0b0100
+_FLAG_BELOW_20MM = 0b1000
+
+
+def _empty_float() -> np.ndarray:
+    return np.zeros(0, dtype=np.float64)
+
+
+@dataclass(eq=False, **_SLOTS)
+class ControlPointArray:
+    """
+    Per-control-point metrics for a beam stored as parallel NumPy arrays.
+    
+    Structure-of-arrays counterpart of List[ControlPointMetrics]: aggregations
+    can use NumPy reductions directly (e.g. ``cpa.meterset_weight.sum()``).
+    Indexing and iteration still yield ControlPointMetrics objects, and
+    ``to_list()`` returns the full legacy list.
+    
+    Optional per-CP values (aperture_perimeter, PAM) are stored as NaN when
+    absent. SmallApertureFlags are packed into one uint8 per CP
+    (bit 0: <2 mm, bit 1: <5 mm, bit 2: <10 mm, bit 3: <20 mm).
+    """
+    control_point_index: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    aperture_lsv: np.ndarray = field(default_factory=_empty_float)
+    aperture_aav: np.ndarray = field(default_factory=_empty_float)
+    aperture_area: np.ndarray = field(default_factory=_empty_float)  # mm²
+    leaf_travel: np.ndarray = field(default_factory=_empty_float)  # mm
+    meterset_weight: np.ndarray = field(default_factory=_empty_float)
+    aperture_perimeter: np.ndarray = field(default_factory=_empty_float)  # mm, NaN if absent
+    PAM: np.ndarray = field(default_factory=_empty_float)  # NaN if absent
+    small_aperture_flags: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.uint8))
+    
+    @classmethod
+    def empty(cls, n: int) -> "ControlPointArray":
+        """Preallocate storage for n control points."""
+        return cls(
+            control_point_index=np.zeros(n, dtype=np.int64),
+            aperture_lsv=np.zeros(n, dtype=np.float64),
+            aperture_aav=np.zeros(n, dtype=np.float64),
+            aperture_area=np.zeros(n, dtype=np.float64),
+            leaf_travel=np.zeros(n, dtype=np.float64),
+            meterset_weight=np.zeros(n, dtype=np.float64),
+            aperture_perimeter=np.full(n, np.nan),
+            PAM=np.full(n, np.nan),
+            small_aperture_flags=np.zeros(n, dtype=np.uint8),
+        )
+    
+    @classmethod
+    def from_list(cls, items: List[ControlPointMetrics]) -> "ControlPointArray":
+        """Build from a list of ControlPointMetrics."""
+        result = cls.empty(len(items))
+        for i, cpm in enumerate(items):
+            result.set(i, cpm)
+        return result
+    
+    def set(self, i: int, cpm: ControlPointMetrics) -> None:
+        """Store a ControlPointMetrics at position i."""
+        self.control_point_index[i] = cpm.control_point_index
+        self.aperture_lsv[i] = cpm.aperture_lsv
+        self.aperture_aav[i] = cpm.aperture_aav
+        self.aperture_area[i] = cpm.aperture_area
+        self.leaf_travel[i] = cpm.leaf_travel
+        self.meterset_weight[i] = cpm.meterset_weight
+        self.aperture_perimeter[i] = (
+            cpm.aperture_perimeter if cpm.aperture_perimeter is not None else np.nan
+        )
+        self.PAM[i] = cpm.PAM if cpm.PAM is not None else np.nan
+        flags = cpm.small_aperture_flags
+        packed = 0
+        if flags is not None:
+            packed = (
+                (_FLAG_BELOW_2MM if flags.below_2mm else 0)
+                | (_FLAG_BELOW_5MM if flags.below_5mm else 0)
+                | (_FLAG_BELOW_10MM if flags.below_10mm else 0)
+                | (_FLAG_BELOW_20MM if flags.below_20mm else 0)
+            )
+        self.small_aperture_flags[i] = packed
+    
+    def __len__(self) -> int:
+        return len(self.control_point_index)
+    
+    def __getitem__(self, i: int) -> ControlPointMetrics:
+        perimeter = self.aperture_perimeter[i]
+        pam = self.PAM[i]
+        packed = int(self.small_aperture_flags[i])
+        return ControlPointMetrics(
+            control_point_index=int(self.control_point_index[i]),
+            aperture_lsv=float(self.aperture_lsv[i]),
+            aperture_aav=float(self.aperture_aav[i]),
+            aperture_area=float(self.aperture_area[i]),
+            leaf_travel=float(self.leaf_travel[i]),
+            meterset_weight=float(self.meterset_weight[i]),
+            aperture_perimeter=None if np.isnan(perimeter) else float(perimeter),
+            small_aperture_flags=SmallApertureFlags(
+                below_2mm=bool(packed & _FLAG_BELOW_2MM),
+                below_5mm=bool(packed & _FLAG_BELOW_5MM),
+                below_10mm=bool(packed & _FLAG_BELOW_10MM),
+                below_20mm=bool(packed & _FLAG_BELOW_20MM),
+            ),
+            PAM=None if np.isnan(pam) else float(pam),
+        )
+    
+    def __iter__(self) -> Iterator[ControlPointMetrics]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ControlPointArray):
+            return NotImplemented
+        return all(
+            np.array_equal(
+                getattr(self, name),
+                getattr(other, name),
+                equal_nan=getattr(self, name).dtype.kind == "f",
+            )
+            for name in self.__dataclass_fields__
+        )
+    
+    def to_list(self) -> List[ControlPointMetrics]:
+        """Materialize as a list of ControlPointMetrics."""
+        return list(self)
+    
+    @property
+    def below_2mm(self) -> np.ndarray:
+        """Boolean mask of CPs with any gap below 2 mm."""
+        return (self.small_aperture_flags & _FLAG_BELOW_2MM) != 0
+    
+    @property
+    def below_5mm(self) -> np.ndarray:
+        """Boolean mask of CPs with any gap below 5 mm."""
+        return (self.small_aperture_flags & _FLAG_BELOW_5MM) != 0
+    
+    @property
+    def below_10mm(self) -> np.ndarray:
+        """Boolean mask of CPs with any gap below 10 mm."""
+        return (self.small_aperture_flags & _FLAG_BELOW_10MM) != 0
+    
+    @property
+    def below_20mm(self) -> np.ndarray:
+        """Boolean mask of CPs with any gap below 20 mm."""
+        return (self.small_aperture_flags & _FLAG_BELOW_20MM) != 0
+
+
+@dataclass(**_SLOTS)
 class BeamMetrics:
     """
     Comprehensive complexity metrics for a single beam.
@@ -304,11 +484,11 @@ class BeamMetrics:
     PI: Optional[float] = None  # Plan Irregularity
     BAM: Optional[float] = None  # Beam Aperture Modulation (target-specific)
     
-    # Per-control-point data
-    control_point_metrics: List[ControlPointMetrics] = field(default_factory=list)
+    # Per-control-point data (structure of arrays)
+    control_point_metrics: ControlPointArray = field(default_factory=ControlPointArray)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PlanMetrics:
     """
     Aggregate complexity metrics for the entire treatment plan.
@@ -387,7 +567,7 @@ class PlanMetrics:
     calculation_date: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MachineDeliveryParams:
     """Machine delivery parameters for time estimation."""
     max_dose_rate: float = 600.0  # MU/min
@@ -401,7 +581,7 @@ class MachineDeliveryParams:
 # Statistics Types
 # ============================================================================
 
-@dataclass
+@dataclass(**_SLOTS)
 class ExtendedStatistics:
     """Extended statistics for cohort analysis."""
     min: float
@@ -419,7 +599,7 @@ class ExtendedStatistics:
     outliers: List[float] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BoxPlotData:
     """Data for box plot visualization."""
     metric: str
@@ -2,8 +2,11 @@
 Visualization module for RT Plan complexity metrics.
 
 Provides matplotlib/seaborn-based visualizations matching the web application.
+The matplotlib backend defaults to Agg; set RTPLAN_VIS_BACKEND to override it.
 """
 
+from . import _backend  # noqa: F401  (selects the backend before pyplot loads)
+
 from .box_plots import create_box_plots
 from .scatter_matrix import create_scatter_matrix
 from .heatmap import create_correlation_heatmap
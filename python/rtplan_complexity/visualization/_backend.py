@@ -0,0 +1,46 @@
+"""
+Matplotlib backend setup shared by the visualization modules.
+
+The backend is selected once, when the visualization package is imported.
+Set RTPLAN_VIS_BACKEND to choose a backend explicitly; otherwise the
+non-interactive Agg backend is used, unless MPLBACKEND is set or the host
+application has already imported pyplot.
+"""
+
+import os
+import sys
+
+try:
+    import matplotlib
+    HAS_MATPLOTLIB = True
+except ImportError:
+    HAS_MATPLOTLIB = False
+
+if HAS_MATPLOTLIB:
+    _backend = os.environ.get("RTPLAN_VIS_BACKEND")
+    if _backend is None and "MPLBACKEND" not in os.environ and "matplotlib.pyplot" not in sys.modules:
+        _backend = "Agg"
+    if _backend:
+        matplotlib.use(_backend)
+
+    # Load the font cache now rather than on the first plot call
+    from matplotlib import font_manager
+    _ = font_manager.fontManager
+
+
+def _ensure_mpl() -> None:
+    """Raise ImportError if matplotlib is not installed."""
+    if not HAS_MATPLOTLIB:
+        raise ImportError(
+            "matplotlib is required for visualization. "
+            "Install with: pip install rtplan-complexity[viz]"
+        )
+
+
+def _load_seaborn():
+    """Import seaborn on first use; return None if it is not installed."""
+    try:
+        import seaborn
+    except ImportError:
+        return None
+    return seaborn
@@ -8,14 +8,25 @@ from typing import Dict, List, Optional, Union
 
 from ..types import PlanMetrics, ExtendedStatistics
 from ..statistics import calculate_extended_statistics, get_box_plot_data
+from ._backend import _ensure_mpl
 
 try:
     import matplotlib.pyplot as plt
-    import matplotlib.patches as mpatches
     import numpy as np
-    HAS_MATPLOTLIB = True
 except ImportError:
-    HAS_MATPLOTLIB = False
+    pass
+
+
+# (cmap name, n) -> RGBA array, reused across plot calls
+_COLOR_CACHE: Dict[tuple, object] = {}
+
+
+def _get_colors(cmap: str, n: int):
+    """Return n evenly spaced RGBA colors from a named colormap (cached)."""
+    key = (cmap, n)
+    if key not in _COLOR_CACHE:
+        _COLOR_CACHE[key] = plt.get_cmap(cmap, n)(np.arange(n))
+    return _COLOR_CACHE[key]
 
 
 def create_box_plots(
@@ -41,11 +52,9 @@ def create_box_plots(
         show_outliers: Whether to show outlier points
         
     Returns:
-        matplotlib Figure object (or None if matplotlib not available)
+        matplotlib Figure object (or None if there is no data to plot)
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed. Install with: pip install matplotlib")
-        return None
+    _ensure_mpl()
     
     # Convert PlanMetrics list to statistics dict if needed
     if isinstance(data, list):
@@ -73,31 +82,20 @@ def create_box_plots(
     labels = list(data.keys())
     
     # Prepare box plot data
-    box_data = []
-    for metric, stats in data.items():
-        bp_data = get_box_plot_data(stats, metric)
-        box_data.append({
-            "whislo": bp_data.whisker_low,
-            "q1": bp_data.q1,
-            "med": bp_data.median,
-            "q3": bp_data.q3,
-            "whishi": bp_data.whisker_high,
-            "mean": bp_data.mean,
-            "fliers": bp_data.outliers,
-        })
+    bp_list = [get_box_plot_data(stats, metric) for metric, stats in data.items()]
     
     # Create box plots manually using bxp
     bp = ax.bxp(
         [
             {
-                "whislo": bd["whislo"],
-                "q1": bd["q1"],
-                "med": bd["med"],
-                "q3": bd["q3"],
-                "whishi": bd["whishi"],
-                "fliers": bd["fliers"] if show_outliers else [],
+                "whislo": bd.whisker_low,
+                "q1": bd.q1,
+                "med": bd.median,
+                "q3": bd.q3,
+                "whishi": bd.whisker_high,
+                "fliers": bd.outliers if show_outliers else [],
             }
-            for bd in box_data
+            for bd in bp_list
         ],
         positions=positions,
         showfliers=show_outliers,
@@ -105,22 +103,22 @@ def create_box_plots(
     )
     
     # Style the boxes
-    colors = plt.cm.Set3(np.linspace(0, 1, len(data)))
+    colors = _get_colors("Set3", len(data))
     for patch, color in zip(bp["boxes"], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.7)
     
-    # Add mean markers
+    # Add mean markers (one collection for all metrics)
     if show_mean:
-        for i, bd in enumerate(box_data):
-            ax.scatter(
-                i, bd["mean"], 
-                marker="D", 
-                color="red", 
-                s=50, 
-                zorder=3,
-                label="Mean" if i == 0 else None
-            )
+        means = np.fromiter((bd.mean for bd in bp_list), dtype=np.float64, count=len(bp_list))
+        ax.scatter(
+            positions, means,
+            marker="D",
+            color="red",
+            s=50,
+            zorder=3,
+            label="Mean",
+        )
     
     ax.set_xticks(positions)
     ax.set_xticklabels(labels, rotation=45, ha="right")
@@ -160,9 +158,7 @@ def create_grouped_box_plots(
     Returns:
         matplotlib Figure object
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed")
-        return None
+    _ensure_mpl()
     
     fig, ax = plt.subplots(figsize=figsize)
     
@@ -186,7 +182,7 @@ def create_grouped_box_plots(
     bp = ax.boxplot(cluster_data, labels=labels, patch_artist=True)
     
     # Style boxes
-    colors = plt.cm.Set2(np.linspace(0, 1, len(cluster_data)))
+    colors = _get_colors("Set2", len(cluster_data))
     for patch, color in zip(bp["boxes"], colors):
         patch.set_facecolor(color)
         patch.set_alpha(0.7)
@@ -6,21 +6,21 @@ Matches the CorrelationHeatmap component from the web application.
 
 from typing import List, Optional
 
+import numpy as np
+
 from ..types import PlanMetrics
 from ..correlation import calculate_correlation_matrix, METRIC_DISPLAY_NAMES
+from ._backend import _ensure_mpl, _load_seaborn
 
 try:
     import matplotlib.pyplot as plt
-    import numpy as np
-    HAS_MATPLOTLIB = True
 except ImportError:
-    HAS_MATPLOTLIB = False
+    pass
 
-try:
-    import seaborn as sns
-    HAS_SEABORN = True
-except ImportError:
-    HAS_SEABORN = False
+
+# |r| bin edges for create_correlation_table strength labels
+_STRENGTH_BINS = [0.5, 0.7, 0.9]
+_STRENGTH_LABELS = ["Weak", "Moderate", "Strong", "Very strong"]
 
 
 def create_correlation_heatmap(
@@ -45,11 +45,10 @@ def create_correlation_heatmap(
         cmap: Colormap name
         
     Returns:
-        matplotlib Figure object (or None if dependencies not available)
+        matplotlib Figure object (or None if there is no data to plot)
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed. Install with: pip install matplotlib")
-        return None
+    _ensure_mpl()
+    sns = _load_seaborn()
     
     # Calculate correlation matrix
     corr_matrix = calculate_correlation_matrix(metrics_list)
@@ -64,7 +63,7 @@ def create_correlation_heatmap(
     
     fig, ax = plt.subplots(figsize=figsize)
     
-    if HAS_SEABORN:
+    if sns is not None:
         # Use seaborn for nicer heatmap
         sns.heatmap(
             values,
@@ -97,16 +96,13 @@ def create_correlation_heatmap(
         # Rotate x labels
         plt.setp(ax.get_xticklabels(), rotation=45, ha="right", rotation_mode="anchor")
         
-        # Add annotations
+        # Add annotations (strings and colors precomputed for the whole grid)
         if annotate:
-            for i in range(len(labels)):
-                for j in range(len(labels)):
-                    text = ax.text(
-                        j, i, f"{values[i, j]:.2f}",
-                        ha="center", va="center",
-                        color="white" if abs(values[i, j]) > 0.5 else "black",
-                        fontsize=8,
-                    )
+            texts = np.char.mod("%.2f", values)
+            colors = np.where(np.abs(values) > 0.5, "white", "black")
+            text_kw = {"ha": "center", "va": "center", "fontsize": 8}
+            for (i, j), text in np.ndenumerate(texts):
+                ax.text(j, i, text, color=colors[i, j], **text_kw)
     
     ax.set_title(title)
     plt.tight_layout()
@@ -134,29 +130,24 @@ def create_correlation_table(
     """
     corr_matrix = calculate_correlation_matrix(metrics_list)
     
-    results = []
-    for result in corr_matrix.results:
-        if abs(result.correlation) >= threshold:
-            # Determine strength
-            abs_val = abs(result.correlation)
-            if abs_val >= 0.9:
-                strength = "Very strong"
-            elif abs_val >= 0.7:
-                strength = "Strong"
-            elif abs_val >= 0.5:
-                strength = "Moderate"
-            else:
-                strength = "Weak"
-            
-            results.append({
-                "metric1": METRIC_DISPLAY_NAMES.get(result.metric1, result.metric1),
-                "metric2": METRIC_DISPLAY_NAMES.get(result.metric2, result.metric2),
-                "correlation": round(result.correlation, 3),
-                "strength": strength,
-                "direction": "Positive" if result.correlation > 0 else "Negative",
-            })
+    pairs = corr_matrix.results
+    corrs = np.fromiter((r.correlation for r in pairs), dtype=np.float64, count=len(pairs))
+    abs_corrs = np.abs(corrs)
+    strengths = np.digitize(abs_corrs, _STRENGTH_BINS)
     
-    # Sort by absolute correlation
-    results.sort(key=lambda x: abs(x["correlation"]), reverse=True)
+    # Sort by absolute (rounded) correlation, strongest first
+    keep = np.flatnonzero(abs_corrs >= threshold)
+    order = keep[np.argsort(-np.round(abs_corrs[keep], 3), kind="stable")]
+    
+    results = []
+    for k in order:
+        result = pairs[k]
+        results.append({
+            "metric1": METRIC_DISPLAY_NAMES.get(result.metric1, result.metric1),
+            "metric2": METRIC_DISPLAY_NAMES.get(result.metric2, result.metric2),
+            "correlation": round(result.correlation, 3),
+            "strength": _STRENGTH_LABELS[strengths[k]],
+            "direction": "Positive" if result.correlation > 0 else "Negative",
+        })
     
     return results
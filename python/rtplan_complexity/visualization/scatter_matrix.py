@@ -7,14 +7,13 @@ Matches the ScatterMatrix component from the web application.
 from typing import List, Optional
 
 from ..types import PlanMetrics
+from ._backend import _ensure_mpl
 
 try:
     import matplotlib.pyplot as plt
     import numpy as np
-    import pandas as pd
-    HAS_MATPLOTLIB = True
 except ImportError:
-    HAS_MATPLOTLIB = False
+    pass
 
 
 def create_scatter_matrix(
@@ -39,34 +38,32 @@ def create_scatter_matrix(
         color: Point color
         
     Returns:
-        matplotlib Figure object (or None if dependencies not available)
+        matplotlib Figure object (or None if there is no data to plot)
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed. Install with: pip install matplotlib")
-        return None
+    _ensure_mpl()
     
     if metrics is None:
         metrics = ["MCS", "LSV", "AAV", "MFA", "LT", "total_mu"]
     
-    # Build DataFrame
-    data = []
-    for pm in metrics_list:
-        row = {}
-        for metric in metrics:
+    # Build (plans × metrics) value matrix, NaN where a metric is missing
+    arr = np.full((len(metrics_list), len(metrics)), np.nan)
+    for row, pm in enumerate(metrics_list):
+        for col, metric in enumerate(metrics):
             value = getattr(pm, metric, None)
-            row[metric] = float(value) if value is not None else np.nan
-        data.append(row)
-    
-    df = pd.DataFrame(data)
+            if value is not None:
+                arr[row, col] = float(value)
     
     # Remove columns with all NaN
-    df = df.dropna(axis=1, how="all")
-    valid_metrics = df.columns.tolist()
+    col_valid = ~np.isnan(arr).all(axis=0)
+    arr = arr[:, col_valid]
+    valid_metrics = [m for m, v in zip(metrics, col_valid) if v]
     
     if len(valid_metrics) < 2:
         print("Not enough valid metrics for scatter matrix")
         return None
     
+    finite = np.isfinite(arr)
+    
     n = len(valid_metrics)
     fig, axes = plt.subplots(n, n, figsize=figsize)
     
@@ -76,14 +73,14 @@ def create_scatter_matrix(
             
             if i == j:
                 # Diagonal: histogram
-                values = df[metric_x].dropna()
+                values = arr[finite[:, j], j]
                 ax.hist(values, bins=20, color=color, alpha=0.7, edgecolor="white")
             else:
                 # Off-diagonal: scatter plot
-                mask = df[[metric_x, metric_y]].notna().all(axis=1)
+                mask = finite[:, j] & finite[:, i]
                 ax.scatter(
-                    df.loc[mask, metric_x],
-                    df.loc[mask, metric_y],
+                    arr[mask, j],
+                    arr[mask, i],
                     alpha=alpha,
                     color=color,
                     s=20,
@@ -133,9 +130,7 @@ def create_scatter_plot(
     Returns:
         matplotlib Figure object
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed")
-        return None
+    _ensure_mpl()
     
     # Extract data
     x_values = []
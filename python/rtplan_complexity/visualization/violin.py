@@ -7,19 +7,34 @@ Matches the ViolinPlot component from the web application.
 from typing import Dict, List, Optional, Union
 
 from ..types import PlanMetrics
+from ._backend import _ensure_mpl, _load_seaborn
 
 try:
     import matplotlib.pyplot as plt
     import numpy as np
-    HAS_MATPLOTLIB = True
+    from scipy.stats import gaussian_kde
 except ImportError:
-    HAS_MATPLOTLIB = False
+    pass
 
-try:
-    import seaborn as sns
-    HAS_SEABORN = True
-except ImportError:
-    HAS_SEABORN = False
+
+def _metric_values(metrics_list: List[PlanMetrics], metric: str) -> "np.ndarray":
+    """Collect the non-None values of one metric as a float64 array."""
+    values = (getattr(pm, metric, None) for pm in metrics_list)
+    return np.fromiter((v for v in values if v is not None), dtype=np.float64)
+
+
+def _violin_kde(values: "np.ndarray", n_points: int = 128) -> Optional[tuple]:
+    """
+    Gaussian KDE outline for a violin body.
+    
+    Returns (ys, half_width) with the density scaled to a half-width of 0.4,
+    or None when the values are degenerate (fewer than two distinct values).
+    """
+    if values.size < 2 or values.min() == values.max():
+        return None
+    ys = np.linspace(values.min(), values.max(), n_points)
+    density = gaussian_kde(values)(ys)
+    return ys, density * (0.4 / density.max())
 
 
 def create_violin_plot(
@@ -44,11 +59,10 @@ def create_violin_plot(
         show_points: Whether to show individual data points
         
     Returns:
-        matplotlib Figure object (or None if dependencies not available)
+        matplotlib Figure object (or None if there is no data to plot)
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed. Install with: pip install matplotlib")
-        return None
+    _ensure_mpl()
+    sns = _load_seaborn()
     
     # Convert PlanMetrics list to values dict if needed
     if isinstance(data, list) and len(data) > 0 and isinstance(data[0], PlanMetrics):
@@ -56,29 +70,24 @@ def create_violin_plot(
             print("Error: metric parameter required when data is PlanMetrics list")
             return None
         
-        values = [
-            getattr(pm, metric, None) 
-            for pm in data 
-            if getattr(pm, metric, None) is not None
-        ]
-        data = {"All Plans": values}
+        data = {"All Plans": _metric_values(data, metric)}
     
     if not data:
         print("No data to plot")
         return None
     
-    fig, ax = plt.subplots(figsize=figsize)
+    fig, ax = plt.subplots(figsize=figsize, constrained_layout=True)
     
-    if HAS_SEABORN:
+    if sns is not None:
         # Prepare data for seaborn
         import pandas as pd
         
-        all_data = []
-        for group, values in data.items():
-            for v in values:
-                all_data.append({"Group": group, "Value": v})
-        
-        df = pd.DataFrame(all_data)
+        arrays = [np.asarray(v, dtype=np.float64) for v in data.values()]
+        lens = np.fromiter((a.size for a in arrays), dtype=np.intp, count=len(arrays))
+        df = pd.DataFrame({
+            "Group": np.repeat(np.array(list(data.keys()), dtype=object), lens),
+            "Value": np.concatenate(arrays) if arrays else np.empty(0),
+        })
         
         if len(df) > 0:
             sns.violinplot(
@@ -89,6 +98,9 @@ def create_violin_plot(
                 ax=ax,
                 palette="Set2",
             )
+            # Rasterize the violin bodies; axes and labels stay vector
+            for coll in ax.collections:
+                coll.set_rasterized(True)
             
             if show_points:
                 sns.stripplot(
@@ -117,6 +129,7 @@ def create_violin_plot(
         for i, pc in enumerate(parts.get("bodies", [])):
             pc.set_facecolor(colors[i])
             pc.set_alpha(0.7)
+            pc.set_rasterized(True)
         
         ax.set_xticks(range(len(labels)))
         ax.set_xticklabels(labels)
@@ -128,8 +141,6 @@ def create_violin_plot(
     if len(data) > 4:
         plt.xticks(rotation=45, ha="right")
     
-    plt.tight_layout()
-    
     if save_path:
         fig.savefig(save_path, dpi=150, bbox_inches="tight")
         print(f"Saved violin plot to {save_path}")
@@ -157,32 +168,48 @@ def create_multi_violin_plot(
     Returns:
         matplotlib Figure object
     """
-    if not HAS_MATPLOTLIB:
-        print("Warning: matplotlib not installed")
-        return None
+    _ensure_mpl()
     
-    fig, axes = plt.subplots(1, len(metrics), figsize=figsize, sharey=False)
+    fig, axes = plt.subplots(
+        1, len(metrics), figsize=figsize, sharey=False, constrained_layout=True
+    )
     if len(metrics) == 1:
         axes = [axes]
     
+    # Metrics with identical values share one KDE fit
+    kde_cache: Dict[bytes, Optional[tuple]] = {}
+    
     for ax, metric in zip(axes, metrics):
-        values = [
-            getattr(pm, metric, None) 
-            for pm in metrics_list 
-            if getattr(pm, metric, None) is not None
-        ]
+        values = _metric_values(metrics_list, metric)
         
-        if values:
-            if HAS_SEABORN:
-                sns.violinplot(y=values, ax=ax, color="#8884d8")
+        if values.size:
+            key = values.tobytes()
+            if key not in kde_cache:
+                kde_cache[key] = _violin_kde(values)
+            kde = kde_cache[key]
+            
+            if kde is not None:
+                ys, half_width = kde
+                ax.fill_betweenx(
+                    ys, -half_width, half_width, color="#8884d8", alpha=0.7, rasterized=True
+                )
             else:
-                ax.violinplot([values], showmeans=True, showmedians=True)
+                # Too few distinct values for a KDE: show the points
+                ax.scatter(np.zeros(values.size), values, color="#8884d8")
+            # Summary markers: range line and IQR bar with a median dot (as in
+            # seaborn's inner box), plus a mean tick as violinplot(showmeans=True)
+            q1, median, q3 = np.percentile(values, [25, 50, 75])
+            ax.vlines(0, values.min(), values.max(), color="black", linewidth=1, zorder=2)
+            ax.vlines(0, q1, q3, color="black", linewidth=5, zorder=2)
+            ax.hlines(values.mean(), -0.1, 0.1, color="black", linewidth=1.5, zorder=3)
+            ax.scatter([0], [median], color="white", edgecolor="black", s=25, zorder=3)
+            ax.set_xlim(-0.5, 0.5)
+            ax.set_xticks([])
         
         ax.set_title(metric)
         ax.grid(True, alpha=0.3, axis="y")
     
     fig.suptitle(title, fontsize=14)
-    plt.tight_layout()
     
     if save_path:
         fig.savefig(save_path, dpi=150, bbox_inches="tight")
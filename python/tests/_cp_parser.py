@@ -0,0 +1,59 @@
+"""Shared control-point parser for the standalone UCoMx formula scripts.
+
+Importing it switches pydicom to decoding multi-valued DS/IS elements
+straight into NumPy arrays, for every plan the importing script reads.
+"""
+import numpy as np
+from pydicom import config
+
+config.use_DS_numpy = True
+config.use_IS_numpy = True
+
+
+def parse_beam_soa(ds, beam_idx=0):
+    """Parse one beam into row-stacked control-point arrays.
+
+    MLC banks and Y jaws are carried forward from the previous control point
+    when a CP omits them. Missing gantry angles are NaN and missing meterset
+    weights are 0.
+
+    Returns:
+        (A, B, Y, W, GA, bounds, leaf_widths): (n_cp, n_leaves) bank A and B
+        positions, (n_cp, 2) Y jaws, (n_cp,) cumulative meterset weights and
+        gantry angles, and the MLCX leaf boundaries and widths.
+    """
+    beam = ds.BeamSequence[beam_idx]
+    bounds = np.asarray(next(
+        bld.LeafPositionBoundaries for bld in beam.BeamLimitingDeviceSequence
+        if bld.RTBeamLimitingDeviceType == 'MLCX'
+    ), dtype=np.float64)
+
+    cps = beam.ControlPointSequence
+    n_cp = len(cps)
+    W = np.zeros(n_cp)
+    GA = np.full(n_cp, np.nan)
+    Y = np.empty((n_cp, 2))
+    A = B = None
+    mlc = None
+    y = None
+    for i, cp in enumerate(cps):
+        if 'BeamLimitingDevicePositionSequence' in cp:
+            for bldp in cp.BeamLimitingDevicePositionSequence:
+                device = bldp.RTBeamLimitingDeviceType
+                if device == 'MLCX':
+                    pos = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
+                    half = len(pos) // 2
+                    mlc = (pos[:half], pos[half:])
+                elif device == 'ASYMY':
+                    y = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
+        if A is None:
+            A = np.empty((n_cp, len(mlc[0])))
+            B = np.empty_like(A)
+        A[i], B[i] = mlc
+        Y[i] = y
+        if 'CumulativeMetersetWeight' in cp:
+            W[i] = float(cp.CumulativeMetersetWeight)
+        if 'GantryAngle' in cp:
+            GA[i] = float(cp.GantryAngle)
+
+    return A, B, Y, W, GA, bounds, np.diff(bounds)
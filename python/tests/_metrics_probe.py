@@ -0,0 +1,41 @@
+"""Shared NumPy metric kernels for the standalone UCoMx formula scripts."""
+import numpy as np
+
+
+def lsv_banks(positions, active):
+    """Masi 2008 per-bank LSV of each row: mean(1 - |diff| / max|diff|) over its active leaves.
+
+    Diffs are taken between consecutive active leaves of a row, so the mask may
+    have gaps. Rows with fewer than two active leaves, or no variation, give 1.0.
+    """
+    n_rows = len(positions)
+    rows, cols = np.nonzero(active)
+    # Consecutive active leaves of the same row form each diff
+    same_row = rows[1:] == rows[:-1]
+    diffs = np.abs(np.diff(positions[rows, cols]))[same_row]
+    diff_rows = rows[1:][same_row]
+
+    mx = np.zeros(n_rows)
+    np.maximum.at(mx, diff_rows, diffs)
+    counts = np.bincount(diff_rows, minlength=n_rows)
+    ok = mx > 0  # also excludes rows with fewer than two active leaves
+    terms = 1.0 - diffs / np.where(ok, mx, 1.0)[diff_rows]
+    sums = np.bincount(diff_rows, weights=terms, minlength=n_rows)
+
+    lsv = np.ones(n_rows)
+    lsv[ok] = sums[ok] / counts[ok]
+    return lsv
+
+
+def minmax_ratio(values):
+    """Mean of min/max over neighbouring pairs that are both positive (0 if none)."""
+    v0, v1 = values[:-1], values[1:]
+    both_pos = (v0 > 0) & (v1 > 0)
+    if not both_pos.any():
+        return 0.0
+    return float(np.mean(np.minimum(v0, v1)[both_pos] / np.maximum(v0, v1)[both_pos]))
+
+
+def aperture_areas(gaps, mask, leaf_widths):
+    """Per-row aperture area: gap × leaf width summed over the masked leaves."""
+    return np.where(mask, gaps, 0.0) @ leaf_widths
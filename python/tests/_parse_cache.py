@@ -0,0 +1,30 @@
+"""Content-hash pickle cache shared by the standalone cross-validation scripts."""
+import hashlib
+import pickle
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".cache" / "rt-complexity-lens"  # parsed inputs, by content hash
+
+
+def cached_parse(path: Path, prefix: str, parse):
+    """Return parse(), pickled in CACHE_DIR under a hash of path's contents.
+
+    prefix names the parse; change it whenever parse() would return something
+    different for the same file.
+    """
+    key = hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+    cache_file = CACHE_DIR / f"{prefix}-{key}.pkl"
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    result = parse()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return result
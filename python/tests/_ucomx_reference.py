@@ -0,0 +1,50 @@
+"""UCoMx workbook lookup shared by the standalone UCoMx plan-sweep scripts."""
+from pathlib import Path
+
+import numpy as np
+
+import _cp_parser  # noqa: F401  (DS/IS values as NumPy arrays)
+from _parse_cache import cached_parse
+
+UCOMX_XLSX = r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\0-all-20262822356.397\dataset.xlsx'
+LINAC_DIR = r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\Linac'
+REF_COLUMNS = ('MUs', 'AAV', 'LSV', 'MCSv')
+# Only these top-level elements are read from each plan
+PLAN_TAGS = ['BeamSequence', 'FractionGroupSequence']
+MLC_TYPES = frozenset({'MLCX', 'MLCY'})
+
+
+def load_ucomx_reference(xlsx_path):
+    """Reference columns of the UCoMx workbook as float arrays (NaN = blank cell), sorted by MU.
+
+    The columns are cached under ``~/.cache/rt-complexity-lens`` keyed by a hash of the
+    workbook's contents (see _parse_cache).
+    """
+    # Rows are sorted by the first column, so the column tuple also fixes the order
+    prefix = 'ucomx-ref-' + '-'.join(REF_COLUMNS)
+    return cached_parse(Path(xlsx_path), prefix, lambda: _read_reference_columns(xlsx_path))
+
+
+def _read_reference_columns(xlsx_path):
+    """Parse REF_COLUMNS from the workbook with openpyxl, sorted by MU."""
+    import openpyxl  # local import — only needed on a cache miss
+
+    wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = next(rows)
+        cols = [headers.index(name) for name in REF_COLUMNS]
+        table = np.array([[np.nan if row[c] is None else row[c] for c in cols] for row in rows], dtype=float)
+    finally:
+        wb.close()
+    table = table[np.argsort(table[:, 0])]
+    return {name: table[:, j] for j, name in enumerate(REF_COLUMNS)}
+
+
+def find_reference(mus, total_mu, tol=1.0):
+    """Index of the row whose MU (sorted ``mus``) is closest to total_mu, or None if none is within tol."""
+    i = int(np.searchsorted(mus, total_mu))
+    best = min((j for j in (i - 1, i) if 0 <= j < len(mus)), key=lambda j: abs(mus[j] - total_mu), default=None)
+    if best is None or not abs(mus[best] - total_mu) < tol:
+        return None
+    return best
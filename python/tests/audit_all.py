@@ -130,12 +130,14 @@ def layer_ucomx(ts_plans: dict) -> dict:
         }
     import openpyxl  # local import — only needed when xlsx exists
 
-    from tests.cross_validate_ucomx import COMPARABLE_METRICS, compare_metric  # type: ignore
+    from tests.cross_validate_ucomx import COMPARABLE_METRICS, TOL_BY_TSKEY, compare_metric  # type: ignore
 
     wb = openpyxl.load_workbook(str(UCOMX_XLSX), data_only=True)
     ws_m, ws_i = wb["metrics"], wb["info"]
-    headers = [str(ws_m.cell(1, c).value) for c in range(1, ws_m.max_column + 1)]
-    filenames = [str(ws_i.cell(r, 2).value) for r in range(2, ws_i.max_row + 1)]
+    headers = [str(v) for v in next(ws_m.iter_rows(max_row=1, values_only=True))]
+    filenames = [
+        str(v) for (v,) in ws_i.iter_rows(min_row=2, min_col=2, max_col=2, values_only=True)
+    ]
     ucomx_plans = {}
     for i, fname in enumerate(filenames):
         row = i + 2
@@ -150,11 +152,11 @@ def layer_ucomx(ts_plans: dict) -> dict:
             per_plan[fname] = {"status": "not_in_ucomx"}
             continue
         metrics = {}
-        for u_key, t_key in COMPARABLE_METRICS.items():
+        for u_key, t_key in COMPARABLE_METRICS:
             uv, tv = u.get(u_key), ts_metrics.get(t_key)
             if uv is None or tv is None:
                 continue
-            match, delta, rel = compare_metric(uv, tv, t_key)
+            match, delta, rel = compare_metric(uv, tv, TOL_BY_TSKEY[t_key])
             if match is None:
                 continue
             metrics[t_key] = {
@@ -1,4 +1,5 @@
 """Compare NEW TypeScript metrics (after fix) against UCoMx reference."""
+import bisect
 import json
 import openpyxl
 import os
@@ -10,14 +11,19 @@ with open(ts_path) as f:
 
 # Load UCoMx reference
 wb = openpyxl.load_workbook(
-    r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\0-all-20262822356.397\dataset.xlsx'
+    r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\0-all-20262822356.397\dataset.xlsx',
+    read_only=True,
+    data_only=True,
 )
 ws = wb.active
-headers = [c.value for c in ws[1]]
-ucomx_rows = []
-for row in ws.iter_rows(min_row=2):
-    d = {h: row[i].value for i, h in enumerate(headers)}
-    ucomx_rows.append(d)
+rows_iter = ws.iter_rows(values_only=True)
+headers = next(rows_iter)
+ucomx_rows = list(rows_iter)
+wb.close()
+
+# Rows stay as tuples; columns are read by position
+col = {h: i for i, h in enumerate(headers)}
+idx_mu = col['MUs']
 
 # Metric mapping: TS name -> UCoMx column name
 metric_map = {
@@ -26,6 +32,7 @@ metric_map = {
     'AAV': 'AAV',
     'MCS': 'MCSv',
 }
+metric_cols = [(ts_key, col[ucomx_key]) for ts_key, ucomx_key in metric_map.items() if ucomx_key in col]
 
 # Match TS plans to UCoMx by total MU
 ts_plans = ts_data.get('plans', ts_data) if isinstance(ts_data, dict) else ts_data
@@ -38,6 +45,19 @@ for p in ts_plans:
     mu = p.get('totalMU', 0)
     ts_by_mu[round(mu, 2)] = p
 
+# Sorted MU keys for nearest-neighbour lookup
+mu_keys = sorted(ts_by_mu)
+
+
+def find_ts_plan(ref_mu):
+    """Return the TS plan whose MU is nearest to ref_mu (within 1 MU), or None."""
+    idx = bisect.bisect_left(mu_keys, ref_mu)
+    candidates = [k for k in mu_keys[max(idx - 1, 0):idx + 1] if abs(k - ref_mu) < 1]
+    if not candidates:
+        return None
+    return ts_by_mu[min(candidates, key=lambda k: abs(k - ref_mu))]
+
+
 print(f"Loaded {len(ts_plans)} TS plans, {len(ucomx_rows)} UCoMx plans")
 print()
 
@@ -50,14 +70,10 @@ mismatches = 0
 close_matches = 0
 
 for ref in ucomx_rows:
-    ref_mu = ref['MUs']
+    ref_mu = ref[idx_mu]
     
     # Find TS plan with matching MU
-    ts = None
-    for mu_key, plan in ts_by_mu.items():
-        if abs(mu_key - ref_mu) < 1:
-            ts = plan
-            break
+    ts = find_ts_plan(ref_mu)
     
     if ts is None:
         continue
@@ -68,9 +84,9 @@ for ref in ucomx_rows:
         plan_name = plan_name.split('/')[-1]
     plan_name = plan_name.replace('.dcm', '')[:18]
     
-    for ts_key, ucomx_key in metric_map.items():
+    for ts_key, idx in metric_cols:
         ts_val = ts.get(ts_key)
-        ucomx_val = ref.get(ucomx_key)
+        ucomx_val = ref[idx]
         
         if ts_val is None or ucomx_val is None or ucomx_val == 0:
             continue
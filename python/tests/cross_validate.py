@@ -22,8 +22,24 @@ Usage:
 import json
 import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Add parent to path so we can import rtplan_complexity
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -78,9 +94,19 @@ METRIC_TOLERANCES = {
 BEAM_METRIC_KEYS = ["MCS", "LSV", "AAV", "LT", "LTMCS"]
 
 
-def load_ts_reference(ref_path: Path) -> dict:
-    with open(ref_path) as f:
-        return json.load(f)
+def iter_ts_reference(ref_path: Path):
+    """Yield (filename, metrics) pairs from the TS reference "plans" object.
+
+    Streams with ijson when it is installed, otherwise loads the whole file
+    (with orjson if available).
+    """
+    if HAS_IJSON:
+        with open(ref_path, "rb") as f:
+            # use_float: plain floats, not Decimal, to match json.load
+            yield from ijson.kvitems(f, "plans", use_float=True)
+    else:
+        with open(ref_path, "rb") as f:
+            yield from _loads(f.read())["plans"].items()
 
 
 def compute_python_metrics(dcm_path: str) -> dict:
@@ -150,6 +176,21 @@ def compute_python_metrics(dcm_path: str) -> dict:
     return flat
 
 
+def _worker(task):
+    """Compute Python metrics for one plan in a worker process."""
+    filename, path = task
+    try:
+        return filename, compute_python_metrics(path), None
+    except Exception as e:
+        return filename, None, e
+
+
+def _delta_and_pass(ts: float, py: float, tol: float):
+    """Numeric core of compare_value: absolute delta and tolerance check."""
+    delta = abs(ts - py)
+    return delta, delta <= tol
+
+
 def compare_value(key: str, ts_val, py_val, tol: float):
     """Compare two numeric values. Returns (passed, delta, message)."""
     if ts_val is None and py_val is None:
@@ -160,14 +201,74 @@ def compare_value(key: str, ts_val, py_val, tol: float):
     if ts_val is None or py_val is None:
         return False, None, f"  {key}: TS={ts_val}  PY={py_val}  (one is None)"
     try:
-        delta = abs(float(ts_val) - float(py_val))
-        passed = delta <= tol
+        delta, passed = _delta_and_pass(float(ts_val), float(py_val), tol)
         msg = "" if passed else f"  {key}: TS={ts_val:.6f}  PY={py_val:.6f}  Δ={delta:.6f} (tol={tol})"
         return passed, delta, msg
     except (TypeError, ValueError):
         return False, None, f"  {key}: TS={ts_val}  PY={py_val}  (non-numeric)"
 
 
+def compare_plan(filename: str, ts_metrics: dict, future, deltas_by_metric: dict):
+    """Compare one plan's TS reference metrics with its Python result.
+
+    future is the pending _worker result, or None if the DICOM file is
+    missing. Plan-level deltas are added to deltas_by_metric. Returns
+    (status, report) where status is "passed", "failed" or "skipped" and
+    report is the plan's section of the console report.
+    """
+    if future is None:
+        return "skipped", f"\n⚠  SKIP  {filename}  (file not found)"
+
+    _, py_metrics, err = future.result()
+    if err is not None:
+        return "failed", f"\n✗  FAIL  {filename}  Python parse/compute error: {err}"
+
+    # --- Plan-level comparison ---
+    plan_failures = []
+    # One slot per METRIC_TOLERANCES entry; NaN where not comparable
+    plan_deltas = np.full(len(METRIC_TOLERANCES), np.nan)
+
+    for i, (key, tol) in enumerate(METRIC_TOLERANCES.items()):
+        ts_val = ts_metrics.get(key)
+        py_val = py_metrics.get(key)
+        passed, delta, msg = compare_value(key, ts_val, py_val, tol)
+        if delta is not None:
+            plan_deltas[i] = delta
+            deltas_by_metric.setdefault(key, []).append(delta)
+        if not passed:
+            plan_failures.append(msg)
+
+    # --- Beam-level comparison ---
+    ts_beams = ts_metrics.get("beamMetrics", [])
+    py_beams = py_metrics.get("beamMetrics", [])
+
+    beam_failures = []
+    if len(ts_beams) != len(py_beams):
+        beam_failures.append(
+            f"  beamCount: TS={len(ts_beams)} PY={len(py_beams)}"
+        )
+    else:
+        for bi, (ts_b, py_b) in enumerate(zip(ts_beams, py_beams)):
+            for key in BEAM_METRIC_KEYS:
+                ts_val = ts_b.get(key)
+                py_val = py_b.get(key)
+                tol = METRIC_TOLERANCES.get(key, 0.01)
+                passed, delta, msg = compare_value(
+                    f"beam[{bi}].{key}", ts_val, py_val, tol
+                )
+                if not passed:
+                    beam_failures.append(msg)
+
+    all_failures = plan_failures + beam_failures
+    if all_failures:
+        return "failed", "\n".join([f"\n✗  FAIL  {filename}"] + all_failures)
+
+    # Compute max delta for summary
+    # fmax skips NaN slots; 0 if nothing was comparable
+    max_delta = np.fmax.reduce(plan_deltas, initial=0.0)
+    return "passed", f"✓  PASS  {filename}  (max Δ = {max_delta:.6f})"
+
+
 def main():
     project_root = Path(__file__).resolve().parent.parent.parent
     test_data_dir = project_root / "public" / "test-data"
@@ -178,80 +279,44 @@ def main():
         print("Run: npm test -- export-metrics-json  first.")
         sys.exit(1)
 
-    ts_data = load_ts_reference(ref_path)
-    ts_plans = ts_data["plans"]
-
-    total_files = len(ts_plans)
-    files_passed = 0
-    files_failed = 0
-    files_skipped = 0
-    all_deltas: dict = {}
+    # Plans are independent: submit each one to the process pool as soon as
+    # its reference entry is read. Only the plans still in flight keep their
+    # reference entry; the oldest is compared as soon as its result is back,
+    # so reports stay in reference order without holding every plan.
+    max_in_flight = 2 * (os.cpu_count() or 1)
+    pending = deque()  # (filename, ts_metrics, future or None), reference order
+    counts = {"passed": 0, "failed": 0, "skipped": 0}
+    reports = []  # one short section per plan, printed under the header
+    deltas_by_metric: dict = {}
+    total_files = 0
+
+    def report_oldest():
+        status, report = compare_plan(*pending.popleft(), deltas_by_metric)
+        counts[status] += 1
+        reports.append(report)
+
+    with ProcessPoolExecutor() as executor:
+        for filename, ts_metrics in iter_ts_reference(ref_path):
+            total_files += 1
+            dcm_path = test_data_dir / filename
+            future = None
+            if dcm_path.exists():
+                future = executor.submit(_worker, (filename, str(dcm_path)))
+            pending.append((filename, ts_metrics, future))
+            if len(pending) > max_in_flight:
+                report_oldest()
+        while pending:
+            report_oldest()
+
+    files_passed = counts["passed"]
+    files_failed = counts["failed"]
+    files_skipped = counts["skipped"]
 
     print("=" * 72)
     print(f"Cross-validation: TypeScript ↔ Python  ({total_files} plans)")
     print("=" * 72)
-
-    for filename, ts_metrics in ts_plans.items():
-        dcm_path = test_data_dir / filename
-        if not dcm_path.exists():
-            print(f"\n⚠  SKIP  {filename}  (file not found)")
-            files_skipped += 1
-            continue
-
-        try:
-            py_metrics = compute_python_metrics(str(dcm_path))
-        except Exception as e:
-            print(f"\n✗  FAIL  {filename}  Python parse/compute error: {e}")
-            files_failed += 1
-            continue
-
-        # --- Plan-level comparison ---
-        plan_failures = []
-        plan_deltas = {}
-
-        for key, tol in METRIC_TOLERANCES.items():
-            ts_val = ts_metrics.get(key)
-            py_val = py_metrics.get(key)
-            passed, delta, msg = compare_value(key, ts_val, py_val, tol)
-            if delta is not None:
-                plan_deltas[key] = delta
-            if not passed:
-                plan_failures.append(msg)
-
-        # --- Beam-level comparison ---
-        ts_beams = ts_metrics.get("beamMetrics", [])
-        py_beams = py_metrics.get("beamMetrics", [])
-
-        beam_failures = []
-        if len(ts_beams) != len(py_beams):
-            beam_failures.append(
-                f"  beamCount: TS={len(ts_beams)} PY={len(py_beams)}"
-            )
-        else:
-            for bi, (ts_b, py_b) in enumerate(zip(ts_beams, py_beams)):
-                for key in BEAM_METRIC_KEYS:
-                    ts_val = ts_b.get(key)
-                    py_val = py_b.get(key)
-                    tol = METRIC_TOLERANCES.get(key, 0.01)
-                    passed, delta, msg = compare_value(
-                        f"beam[{bi}].{key}", ts_val, py_val, tol
-                    )
-                    if not passed:
-                        beam_failures.append(msg)
-
-        all_failures = plan_failures + beam_failures
-        if all_failures:
-            print(f"\n✗  FAIL  {filename}")
-            for msg in all_failures:
-                print(msg)
-            files_failed += 1
-        else:
-            # Compute max delta for summary
-            max_delta = max(plan_deltas.values()) if plan_deltas else 0
-            print(f"✓  PASS  {filename}  (max Δ = {max_delta:.6f})")
-            files_passed += 1
-
-        all_deltas[filename] = plan_deltas
+    if reports:
+        print("\n".join(reports))
 
     # --- Summary ---
     print("\n" + "=" * 72)
@@ -259,19 +324,17 @@ def main():
     print("=" * 72)
 
     # Aggregate delta summary per metric
-    if all_deltas:
+    if deltas_by_metric:
         print("\nMetric delta summary (across all plans):")
         print(f"  {'Metric':<12} {'Mean Δ':>10} {'Max Δ':>10} {'Tol':>8}")
         print("  " + "-" * 44)
-        metric_keys = sorted({k for d in all_deltas.values() for k in d})
-        for key in metric_keys:
-            vals = [d[key] for d in all_deltas.values() if key in d]
-            if vals:
-                mean_d = sum(vals) / len(vals)
-                max_d = max(vals)
-                tol = METRIC_TOLERANCES.get(key, "—")
-                status = "✓" if max_d <= (tol if isinstance(tol, float) else 999) else "✗"
-                print(f"  {status} {key:<10} {mean_d:10.6f} {max_d:10.6f} {tol!s:>8}")
+        for key in sorted(deltas_by_metric):
+            vals = np.asarray(deltas_by_metric[key])
+            mean_d = vals.mean()
+            max_d = vals.max()
+            tol = METRIC_TOLERANCES.get(key, "—")
+            status = "✓" if max_d <= (tol if isinstance(tol, float) else 999) else "✗"
+            print(f"  {status} {key:<10} {mean_d:10.6f} {max_d:10.6f} {tol!s:>8}")
 
     sys.exit(1 if files_failed > 0 else 0)
 
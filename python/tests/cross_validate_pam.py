@@ -11,9 +11,12 @@ Python implementation uses exact polygon clipping (Shapely).
 For full validation, both should converge to similar PAM ranges.
 """
 
+import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+import numpy as np
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -28,32 +31,49 @@ RTPLAN_DIR = TEST_DATA_DIR / "RP_RD"
 RTSTRUCT_DIR = TEST_DATA_DIR / "CT_RS"
 
 
+def _scan_rtplans(root) -> Iterator[str]:
+    """Recursively yield paths of RP.*.dcm files below root."""
+    for entry in os.scandir(root):
+        if entry.is_dir():
+            yield from _scan_rtplans(entry.path)
+        elif entry.name.startswith("RP.") and entry.name.endswith(".dcm"):
+            yield entry.path
+
+
+# Map plan types to RTSTRUCT names
+TYPE_MAPPINGS = {
+    'CS': 'CShape',
+    'HN': 'HN',
+    'MT': 'Multi',
+    'PR': 'Prostate',
+}
+
+
+def _index_rtstructs() -> dict:
+    """Scan RTSTRUCT_DIR once and map each plan type to its RTSTRUCT file."""
+    index = {}
+    if RTSTRUCT_DIR.exists():
+        for rs_file in sorted(RTSTRUCT_DIR.glob("RS.*.dcm")):
+            for plan_type, target_name in TYPE_MAPPINGS.items():
+                if target_name in rs_file.stem:
+                    index.setdefault(plan_type, rs_file)
+    return index
+
+
+_RS_CACHE = _index_rtstructs()
+
+
 def find_matching_rtstruct(plan_filename: str) -> Optional[Path]:
     """Find matching RTSTRUCT for a given plan type.
     
     Args:
         plan_filename: Plan filename like 'RP.TG119.CS_ETH_2A_#1.dcm'
     """
-    if RTSTRUCT_DIR.exists():
-        # Extract plan type: CS, HN, MT, PR from filenames like "RP.TG119.CS_ETH_2A_#1.dcm"
-        parts = plan_filename.replace('.dcm', '').split('.')
-        if len(parts) >= 3:
-            plan_suffix = parts[2]  # e.g., "CS_ETH_2A_#1"
-            plan_type = plan_suffix.split('_')[0]  # e.g., "CS"
-            
-            # Map plan types to RTSTRUCT names
-            type_mappings = {
-                'CS': 'CShape',
-                'HN': 'HN',
-                'MT': 'Multi',
-                'PR': 'Prostate',
-            }
-            
-            target_name = type_mappings.get(plan_type)
-            if target_name:
-                for rs_file in RTSTRUCT_DIR.glob("RS.*.dcm"):
-                    if target_name in rs_file.stem:
-                        return rs_file
+    # Extract plan type: CS, HN, MT, PR from filenames like "RP.TG119.CS_ETH_2A_#1.dcm"
+    parts = plan_filename.split('.', 3)
+    if len(parts) >= 3:
+        plan_type = parts[2].split('_', 1)[0]  # "CS_ETH_2A_#1" -> "CS"
+        return _RS_CACHE.get(plan_type)
     return None
 
 
@@ -94,8 +114,12 @@ def validate_pam_single_plan(rtplan_file: Path, rtstruct_file: Optional[Path] =
         # Calculate metrics
         print(f"  Calculating metrics...")
         
+        # Aperture polygons don't depend on the target; share them across
+        # the per-structure calls below
+        aperture_cache = {}
+        
         # Without structure
-        metrics_no_struct = calculate_plan_metrics(rtplan)
+        metrics_no_struct = calculate_plan_metrics(rtplan, aperture_cache=aperture_cache)
         print(f"    [OK] Metrics without target: MCS={metrics_no_struct.MCS:.4f}, AAV={metrics_no_struct.AAV:.4f}")
         
         # With each available structure
@@ -116,7 +140,9 @@ def validate_pam_single_plan(rtplan_file: Path, rtstruct_file: Optional[Path] =
         
         for struct_name, structure in structures_dict.items():
             print(f"    Calculating with target: {struct_name}")
-            metrics_with_struct = calculate_plan_metrics(rtplan, structure=structure)
+            metrics_with_struct = calculate_plan_metrics(
+                rtplan, structure=structure, aperture_cache=aperture_cache
+            )
             
             pam_value = metrics_with_struct.PAM
             if pam_value is not None:
@@ -178,7 +204,7 @@ def validate_pam_batch():
         return
     
     # Find all RTPLAN files (nested in subdirectories like TG119_CS/RP.*.dcm)
-    rtplan_files = sorted(RTPLAN_DIR.glob("**/RP.*.dcm"))
+    rtplan_files = [Path(p) for p in sorted(_scan_rtplans(RTPLAN_DIR))]
     
     if not rtplan_files:
         print(f"WARNING: No RTPLAN files found in {RTPLAN_DIR}")
@@ -205,12 +231,14 @@ def validate_pam_batch():
                     print(f"{plan_result['file']:40s} + {struct_name:15s}: PAM = {metrics['PAM']:.4f}")
     
     if pam_values_with_struct:
+        pam_arr = np.asarray(pam_values_with_struct, dtype=np.float64)
+        mid = len(pam_arr) // 2
         print(f"\nPAM Statistics:")
-        print(f"  Min:    {min(pam_values_with_struct):.4f}")
-        print(f"  Max:    {max(pam_values_with_struct):.4f}")
-        print(f"  Mean:   {sum(pam_values_with_struct) / len(pam_values_with_struct):.4f}")
-        print(f"  Median: {sorted(pam_values_with_struct)[len(pam_values_with_struct)//2]:.4f}")
-        print(f"  N:      {len(pam_values_with_struct)}")
+        print(f"  Min:    {pam_arr.min():.4f}")
+        print(f"  Max:    {pam_arr.max():.4f}")
+        print(f"  Mean:   {pam_arr.mean():.4f}")
+        print(f"  Median: {np.partition(pam_arr, mid)[mid]:.4f}")
+        print(f"  N:      {len(pam_arr)}")
     
     # Export results
     results_file = Path(__file__).parent / "cross_validate_pam_results.json"
@@ -9,11 +9,15 @@ Reads:
 Reports metric-by-metric comparison for all overlapping plans.
 """
 
+import functools
 import json
 import sys
+from math import fabs, isclose
 from pathlib import Path
 
-import openpyxl
+import numpy as np
+
+from _parse_cache import cached_parse
 
 # ============================================================================
 # Paths
@@ -82,8 +86,14 @@ UCOMX_TO_TS = {
     "JA":               "JA",
 }
 
-# List of metrics we expect to exactly match (same algorithm)
-COMPARABLE_METRICS = {k: v for k, v in UCOMX_TO_TS.items() if v is not None}
+# (UCoMx key, TS key) pairs we expect to exactly match (same algorithm)
+COMPARABLE_METRICS = tuple((k, v) for k, v in UCOMX_TO_TS.items() if v is not None)
+
+# TS key → first UCoMx key mapped to it
+TS_TO_UCOMX = {v: k for k, v in reversed(COMPARABLE_METRICS)}
+
+# Every TS key that has a UCoMx counterpart
+TS_MAPPED = frozenset(TS_TO_UCOMX)
 
 # ============================================================================
 # Tolerance thresholds per metric (relative or absolute)
@@ -104,46 +114,64 @@ ABSOLUTE_TOL = {       # metric-specific absolute tolerances
     "avgDoseRate": 10, # MU/min
 }
 
+# Row templates for the per-pair report sections
+MISMATCH_ROW = "  {:<40} {:<12} UCoMx={:<14.6f} TS={:<14.6f} D={:<10.4f} rel={:.2f}%\n".format
+DETAIL_ROW = "{:<16} {:<14} {:>14.6f} {:>14.6f} {:>10.4f} {:>7.2f}% {:>8}\n".format
+
+# Absolute tolerance for every comparable TS key (0.01 unless listed above)
+TOL_BY_TSKEY = {t: ABSOLUTE_TOL.get(t, 0.01) for _, t in COMPARABLE_METRICS}
+
 
 def load_ucomx_data():
-    """Load UCoMx xlsx and return {filename: {metric: value}}."""
-    wb = openpyxl.load_workbook(str(UCOMX_XLSX), data_only=True)
-    ws_m = wb["metrics"]
-    ws_i = wb["info"]
-
-    # Parse headers from metrics sheet
-    headers = []
-    for c in range(1, ws_m.max_column + 1):
-        headers.append(str(ws_m.cell(1, c).value))
-
-    # Parse filenames from info sheet
-    filenames = []
-    for r in range(2, ws_i.max_row + 1):
-        filenames.append(str(ws_i.cell(r, 2).value))
-
-    # Build plan dict
-    plans = {}
-    for i, fname in enumerate(filenames):
-        row_idx = i + 2  # 1-indexed, skip header
-        metrics = {}
-        for j, header in enumerate(headers):
-            val = ws_m.cell(row_idx, j + 1).value
-            if val is not None:
-                metrics[header] = val
-        plans[fname] = metrics
-
-    return plans
+    """Load UCoMx xlsx and return {filename: {metric: value}}.
+
+    The parsed result is cached and reused while the workbook's contents are
+    unchanged. Returns an empty dict if the workbook is not present.
+    """
+    if not UCOMX_XLSX.exists():
+        return {}
+    return cached_parse(UCOMX_XLSX, "ucomx", _parse_ucomx_xlsx)
 
 
+def _parse_ucomx_xlsx():
+    """Parse the UCoMx workbook with openpyxl."""
+    import openpyxl  # local import — only needed when xlsx exists
+
+    wb = openpyxl.load_workbook(str(UCOMX_XLSX), data_only=True, read_only=True)
+    try:
+        # Metrics sheet: header row, then one row per plan
+        rows_m = wb["metrics"].iter_rows(values_only=True)
+        headers = [str(v) for v in next(rows_m)]
+        metrics_rows = [
+            {h: v for h, v in zip(headers, row) if v is not None}
+            for row in rows_m
+        ]
+
+        # Info sheet: plan filename in column 2
+        filenames = [
+            str(v) for (v,) in wb["info"].iter_rows(min_row=2, min_col=2, max_col=2, values_only=True)
+        ]
+    finally:
+        wb.close()
+
+    return dict(zip(filenames, metrics_rows))
+
+
+@functools.lru_cache(maxsize=None)
 def load_ts_data():
     """Load TS reference JSON and return {filename: {metric: value}}."""
+    return cached_parse(TS_REF_JSON, "ts-ref", _parse_ts_json)
+
+
+def _parse_ts_json():
     with open(str(TS_REF_JSON)) as f:
         data = json.load(f)
     return data["plans"]
 
 
-def compare_metric(ucomx_val, ts_val, ts_key):
-    """Compare two metric values. Return (match, delta, rel_delta)."""
+def compare_metric(ucomx_val, ts_val, abs_tol):
+    """Compare two metric values against abs_tol (see TOL_BY_TSKEY) and
+    RELATIVE_TOL. Return (match, delta, rel_delta)."""
     if ucomx_val is None or ts_val is None:
         return None, None, None
 
@@ -153,26 +181,58 @@ def compare_metric(ucomx_val, ts_val, ts_key):
     except (ValueError, TypeError):
         return None, None, None
 
-    # Handle zeros
-    if u == 0 and t == 0:
-        return True, 0.0, 0.0
+    return compare_metric_fast(u, t, abs_tol)
+
 
-    delta = abs(u - t)
+def compare_metric_fast(u: float, t: float, abs_tol: float):
+    """compare_metric for values that are already floats.
 
-    # Relative delta (relative to UCoMx reference)
-    denom = max(abs(u), abs(t), 1e-10)
-    rel_delta = delta / denom
+    Two zeros need no special case: delta is 0, so they match with rel_delta 0.
+    """
+    delta = fabs(u - t)
+    denom = max(fabs(u), fabs(t), 1e-10)
 
-    # Check absolute tolerance
-    abs_tol = ABSOLUTE_TOL.get(ts_key, 0.01)
-    if delta <= abs_tol:
-        return True, delta, rel_delta
+    # Absolute or relative tolerance (relative to the larger magnitude)
+    match = isclose(u, t, rel_tol=RELATIVE_TOL, abs_tol=abs_tol)
+    return match, delta, delta / denom
 
-    # Check relative tolerance
-    if rel_delta <= RELATIVE_TOL:
-        return True, delta, rel_delta
 
-    return False, delta, rel_delta
+def _to_float(val):
+    """float(val), or None if val is missing or not numeric."""
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return None
+
+
+def _column(values):
+    """Float array of values plus a mask of those present and numeric.
+
+    Absent or non-numeric values are NaN in the array and False in the mask, so
+    a NaN that was actually reported stays distinguishable from a missing value.
+    """
+    floats = [_to_float(v) for v in values]
+    present = np.array([f is not None for f in floats], dtype=bool)
+    col = np.array([np.nan if f is None else f for f in floats], dtype=np.float64)
+    return col, present
+
+
+def compare_metrics(u, t, valid, abs_tol):
+    """Vectorized compare_metric over one metric column.
+
+    u and t are float arrays (see _column), valid the mask of rows where both
+    are present and abs_tol the metric's absolute tolerance. Returns (match,
+    delta, rel_delta) arrays, meaningful only where valid is set. As in
+    compare_metric, a NaN value never matches.
+    """
+    # Work in place where possible to keep temporaries down
+    delta = np.subtract(u, t)
+    np.abs(delta, out=delta)
+    denom = np.maximum(np.abs(u), np.abs(t))
+    np.maximum(denom, 1e-10, out=denom)
+    match = delta <= abs_tol
+    match |= delta <= RELATIVE_TOL * denom
+    return match, delta, np.divide(delta, denom, out=denom)
 
 
 def main():
@@ -187,7 +247,7 @@ def main():
     print(f"TS plans:    {len(ts_plans)}")
 
     # Find overlapping plans
-    overlap = set(ucomx_plans.keys()) & set(ts_plans.keys())
+    overlap = ucomx_plans.keys() & ts_plans.keys()
     print(f"Overlapping: {len(overlap)}")
     print()
 
@@ -198,37 +258,42 @@ def main():
         print("\nTS filenames:", sorted(ts_plans.keys()))
         sys.exit(1)
 
-    # Track results
-    all_results = []  # (plan, ucomx_key, ts_key, ucomx_val, ts_val, match, delta, rel_delta)
-    summary_by_metric = {}  # ts_key -> {match, mismatch, missing}
-
-    for plan in sorted(overlap):
-        u_metrics = ucomx_plans[plan]
-        t_metrics = ts_plans[plan]
-
-        for ucomx_key, ts_key in COMPARABLE_METRICS.items():
-            if ts_key not in summary_by_metric:
-                summary_by_metric[ts_key] = {"match": 0, "mismatch": 0, "missing": 0, "deltas": []}
-
-            ucomx_val = u_metrics.get(ucomx_key)
-            ts_val = t_metrics.get(ts_key)
+    # Fixed plan order; the first plan is the sample for the sections below
+    sorted_overlap = sorted(overlap)
+    sample_plan = sorted_overlap[0]
 
-            if ucomx_val is None or ts_val is None:
-                summary_by_metric[ts_key]["missing"] += 1
-                all_results.append((plan, ucomx_key, ts_key, ucomx_val, ts_val, None, None, None))
-                continue
-
-            match, delta, rel_delta = compare_metric(ucomx_val, ts_val, ts_key)
-            if match is None:
-                summary_by_metric[ts_key]["missing"] += 1
-            elif match:
-                summary_by_metric[ts_key]["match"] += 1
-                summary_by_metric[ts_key]["deltas"].append(rel_delta)
-            else:
-                summary_by_metric[ts_key]["mismatch"] += 1
-                summary_by_metric[ts_key]["deltas"].append(rel_delta)
-
-            all_results.append((plan, ucomx_key, ts_key, ucomx_val, ts_val, match, delta, rel_delta))
+    # Track results
+    mismatches = []  # (plan_idx, metric_idx, plan, ucomx_key, ts_key, ucomx_val, ts_val, delta, rel_delta)
+    summary_by_metric = {}  # ts_key -> {match, mismatch, missing, max_rel}
+    sample_results = {}  # ts_key -> (ucomx_val, ts_val, ucomx_ok, ts_ok, match, delta, rel_delta) for sample_plan
+
+    # One column of values per metric across all plans, compared in one pass
+    u_rows = [ucomx_plans[plan] for plan in sorted_overlap]
+    t_rows = [ts_plans[plan] for plan in sorted_overlap]
+    for j, (ucomx_key, ts_key) in enumerate(COMPARABLE_METRICS):
+        u_vals = [row.get(ucomx_key) for row in u_rows]
+        t_vals = [row.get(ts_key) for row in t_rows]
+        u_col, u_present = _column(u_vals)
+        t_col, t_present = _column(t_vals)
+        valid = u_present & t_present
+        match, delta, rel_delta = compare_metrics(u_col, t_col, valid, TOL_BY_TSKEY[ts_key])
+        # Row 0 is the sample plan; its results feed the detailed table below
+        sample_results[ts_key] = (u_col[0], t_col[0], u_present[0], t_present[0],
+                                  match[0], delta[0], rel_delta[0])
+        n_valid = int(valid.sum())
+        n_match = int((valid & match).sum())
+        summary_by_metric[ts_key] = {
+            "match": n_match,
+            "mismatch": n_valid - n_match,
+            "missing": len(valid) - n_valid,
+            "max_rel": rel_delta[valid].max() if n_valid else 0,
+        }
+        for i in np.flatnonzero(valid & ~match):
+            mismatches.append((i, j, sorted_overlap[i], ucomx_key, ts_key,
+                               u_vals[i], t_vals[i], delta[i], rel_delta[i]))
+
+    # Report mismatches plan by plan, in metric order
+    mismatches.sort(key=lambda m: m[:2])
 
     # ========================================================================
     # Print per-metric summary
@@ -243,8 +308,8 @@ def main():
     for ts_key in sorted(summary_by_metric.keys()):
         s = summary_by_metric[ts_key]
         # Find corresponding UCoMx key
-        ucomx_key = [k for k, v in COMPARABLE_METRICS.items() if v == ts_key][0]
-        max_rel = max(s["deltas"]) * 100 if s["deltas"] else 0
+        ucomx_key = TS_TO_UCOMX[ts_key]
+        max_rel = s["max_rel"] * 100
         status = "PASS" if s["mismatch"] == 0 else "FAIL"
         print(f"{ts_key:<16} {ucomx_key:<14} {s['match']:>6} {s['mismatch']:>9} {s['missing']:>8} {max_rel:>9.2f}%  {status}")
 
@@ -258,9 +323,10 @@ def main():
         print("\n" + "=" * 80)
         print("MISMATCH DETAILS")
         print("=" * 80)
-        for plan, ucomx_key, ts_key, u_val, t_val, match, delta, rel_delta in all_results:
-            if match is False:
-                print(f"  {plan:<40} {ts_key:<12} UCoMx={u_val:<14.6f} TS={t_val:<14.6f} D={delta:<10.4f} rel={rel_delta*100:.2f}%")
+        sys.stdout.write("".join(
+            MISMATCH_ROW(plan, ts_key, u_val, t_val, delta, rel_delta * 100)
+            for _, _, plan, _, ts_key, u_val, t_val, delta, rel_delta in mismatches
+        ))
 
     # ========================================================================
     # Print metrics NOT in TS
@@ -271,7 +337,6 @@ def main():
     for ucomx_key, ts_key in sorted(UCOMX_TO_TS.items()):
         if ts_key is None:
             # Get sample value
-            sample_plan = list(overlap)[0]
             sample_val = ucomx_plans[sample_plan].get(ucomx_key)
             print(f"  {ucomx_key:<16} sample={sample_val}")
 
@@ -281,36 +346,31 @@ def main():
     print("\n" + "=" * 80)
     print("TS METRICS NOT IN UCoMx")
     print("=" * 80)
-    ts_mapped = set(UCOMX_TO_TS.values()) - {None}
-    sample_plan = list(overlap)[0]
-    for ts_key in sorted(ts_plans[sample_plan].keys()):
-        if ts_key not in ts_mapped:
-            print(f"  {ts_key:<20} = {ts_plans[sample_plan].get(ts_key)}")
+    for ts_key in sorted(ts_plans[sample_plan].keys() - TS_MAPPED):
+        print(f"  {ts_key:<20} = {ts_plans[sample_plan][ts_key]}")
 
     # ========================================================================
     # Per-plan detailed comparison for one sample plan
     # ========================================================================
     print("\n" + "=" * 80)
-    sample = sorted(overlap)[0]
-    print(f"DETAILED COMPARISON: {sample}")
+    print(f"DETAILED COMPARISON: {sample_plan}")
     print("=" * 80)
-    u_m = ucomx_plans[sample]
-    t_m = ts_plans[sample]
     print(f"{'Metric':<16} {'UCoMx Key':<14} {'UCoMx Value':>14} {'TS Value':>14} {'Delta':>10} {'Rel%':>8} {'Status':>8}")
     print("-" * 90)
-    for ucomx_key, ts_key in sorted(COMPARABLE_METRICS.items(), key=lambda x: x[1]):
-        u_val = u_m.get(ucomx_key)
-        t_val = t_m.get(ts_key)
-        if u_val is not None and t_val is not None:
-            match, delta, rel_delta = compare_metric(u_val, t_val, ts_key)
+    lines = []
+    for ucomx_key, ts_key in sorted(COMPARABLE_METRICS, key=lambda x: x[1]):
+        # Reuse the summary pass
+        u_val, t_val, u_ok, t_ok, match, delta, rel_delta = sample_results[ts_key]
+        if u_ok and t_ok:
             status = "PASS" if match else "FAIL"
-            print(f"{ts_key:<16} {ucomx_key:<14} {float(u_val):>14.6f} {float(t_val):>14.6f} {delta:>10.4f} {rel_delta*100:>7.2f}% {status:>8}")
-        elif u_val is not None:
-            print(f"{ts_key:<16} {ucomx_key:<14} {float(u_val):>14.6f} {'N/A':>14} {'':>10} {'':>8} {'MISSING':>8}")
-        elif t_val is not None:
-            print(f"{ts_key:<16} {ucomx_key:<14} {'N/A':>14} {float(t_val):>14.6f} {'':>10} {'':>8} {'EXTRA':>8}")
+            lines.append(DETAIL_ROW(ts_key, ucomx_key, u_val, t_val, delta, rel_delta * 100, status))
+        elif u_ok:
+            lines.append(f"{ts_key:<16} {ucomx_key:<14} {u_val:>14.6f} {'N/A':>14} {'':>10} {'':>8} {'MISSING':>8}\n")
+        elif t_ok:
+            lines.append(f"{ts_key:<16} {ucomx_key:<14} {'N/A':>14} {t_val:>14.6f} {'':>10} {'':>8} {'EXTRA':>8}\n")
         else:
-            print(f"{ts_key:<16} {ucomx_key:<14} {'N/A':>14} {'N/A':>14} {'':>10} {'':>8} {'BOTH N/A':>8}")
+            lines.append(f"{ts_key:<16} {ucomx_key:<14} {'N/A':>14} {'N/A':>14} {'':>10} {'':>8} {'BOTH N/A':>8}\n")
+    sys.stdout.write("".join(lines))
 
     # Final summary
     total_matches = sum(s["match"] for s in summary_by_metric.values())
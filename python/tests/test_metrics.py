@@ -6,6 +6,7 @@ Tests metric calculations against reference data from TypeScript.
 
 import pytest
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import sys
 
@@ -24,6 +25,7 @@ from rtplan_complexity.types import (
     MLCLeafPositions,
     JawPositions,
     Technique,
+    ControlPointArray,
 )
 from rtplan_complexity.metrics import (
     calculate_aperture_area,
@@ -33,6 +35,113 @@ from rtplan_complexity.metrics import (
 )
 
 
+@pytest.fixture(scope="module")
+def simple_beam() -> Beam:
+    """Create a simple beam for testing."""
+    control_points = [
+        ControlPoint(
+            index=0,
+            gantry_angle=0.0,
+            gantry_rotation_direction="CW",
+            beam_limiting_device_angle=0.0,
+            cumulative_meterset_weight=0.0,
+            mlc_positions=MLCLeafPositions(
+                bank_a=[-10.0] * 60,
+                bank_b=[10.0] * 60,
+            ),
+            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+        ),
+        ControlPoint(
+            index=1,
+            gantry_angle=90.0,
+            gantry_rotation_direction="CW",
+            beam_limiting_device_angle=0.0,
+            cumulative_meterset_weight=1.0,
+            mlc_positions=MLCLeafPositions(
+                bank_a=[-15.0] * 60,
+                bank_b=[15.0] * 60,
+            ),
+            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+        ),
+    ]
+    
+    return Beam(
+        beam_number=1,
+        beam_name="Test Arc",
+        beam_type="DYNAMIC",
+        radiation_type="PHOTON",
+        treatment_delivery_type="TREATMENT",
+        number_of_control_points=2,
+        control_points=control_points,
+        final_cumulative_meterset_weight=1.0,
+        beam_dose=100.0,
+        gantry_angle_start=0.0,
+        gantry_angle_end=90.0,
+        is_arc=True,
+        mlc_leaf_widths=[5.0] * 60,
+        number_of_leaves=60,
+    )
+
+
+@pytest.fixture(scope="module")
+def simple_plan() -> RTPlan:
+    """Create a simple plan for testing."""
+    control_points = [
+        ControlPoint(
+            index=0,
+            gantry_angle=0.0,
+            gantry_rotation_direction="CW",
+            beam_limiting_device_angle=0.0,
+            cumulative_meterset_weight=0.0,
+            mlc_positions=MLCLeafPositions(
+                bank_a=[-10.0] * 60,
+                bank_b=[10.0] * 60,
+            ),
+            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+        ),
+        ControlPoint(
+            index=1,
+            gantry_angle=180.0,
+            gantry_rotation_direction="CW",
+            beam_limiting_device_angle=0.0,
+            cumulative_meterset_weight=1.0,
+            mlc_positions=MLCLeafPositions(
+                bank_a=[-20.0] * 60,
+                bank_b=[20.0] * 60,
+            ),
+            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+        ),
+    ]
+    
+    beam = Beam(
+        beam_number=1,
+        beam_name="Arc 1",
+        beam_type="DYNAMIC",
+        radiation_type="PHOTON",
+        treatment_delivery_type="TREATMENT",
+        number_of_control_points=2,
+        control_points=control_points,
+        final_cumulative_meterset_weight=1.0,
+        beam_dose=500.0,
+        gantry_angle_start=0.0,
+        gantry_angle_end=180.0,
+        is_arc=True,
+        mlc_leaf_widths=[5.0] * 60,
+        number_of_leaves=60,
+    )
+    
+    return RTPlan(
+        patient_id="TEST",
+        patient_name="Test",
+        plan_label="Test Plan",
+        plan_name="Test",
+        beams=[beam],
+        fraction_groups=[],
+        total_mu=500.0,
+        technique=Technique.VMAT,
+    )
+
+
 class TestMetricFunctions:
     """Test individual metric calculation functions."""
     
@@ -142,56 +251,9 @@ class TestMetricFunctions:
 class TestBeamMetrics:
     """Test beam-level metrics calculation."""
     
-    def create_simple_beam(self) -> Beam:
-        """Create a simple beam for testing."""
-        control_points = [
-            ControlPoint(
-                index=0,
-                gantry_angle=0.0,
-                gantry_rotation_direction="CW",
-                beam_limiting_device_angle=0.0,
-                cumulative_meterset_weight=0.0,
-                mlc_positions=MLCLeafPositions(
-                    bank_a=[-10.0] * 60,
-                    bank_b=[10.0] * 60,
-                ),
-                jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-            ),
-            ControlPoint(
-                index=1,
-                gantry_angle=90.0,
-                gantry_rotation_direction="CW",
-                beam_limiting_device_angle=0.0,
-                cumulative_meterset_weight=1.0,
-                mlc_positions=MLCLeafPositions(
-                    bank_a=[-15.0] * 60,
-                    bank_b=[15.0] * 60,
-                ),
-                jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-            ),
-        ]
-        
-        return Beam(
-            beam_number=1,
-            beam_name="Test Arc",
-            beam_type="DYNAMIC",
-            radiation_type="PHOTON",
-            treatment_delivery_type="TREATMENT",
-            number_of_control_points=2,
-            control_points=control_points,
-            final_cumulative_meterset_weight=1.0,
-            beam_dose=100.0,
-            gantry_angle_start=0.0,
-            gantry_angle_end=90.0,
-            is_arc=True,
-            mlc_leaf_widths=[5.0] * 60,
-            number_of_leaves=60,
-        )
-    
-    def test_beam_metrics_calculation(self):
+    def test_beam_metrics_calculation(self, simple_beam):
         """Test beam metrics calculation."""
-        beam = self.create_simple_beam()
-        metrics = calculate_beam_metrics(beam)
+        metrics = calculate_beam_metrics(simple_beam)
         
         assert metrics.beam_number == 1
         assert metrics.beam_name == "Test Arc"
@@ -205,71 +267,32 @@ class TestBeamMetrics:
         assert metrics.MFA >= 0.0
         assert metrics.LT >= 0.0
 
+    def test_control_point_array(self, simple_beam):
+        """Test per-CP metrics are stored as arrays and round-trip to dataclasses."""
+        cp_metrics = calculate_beam_metrics(simple_beam).control_point_metrics
+
+        assert isinstance(cp_metrics, ControlPointArray)
+        assert len(cp_metrics) == 2
+        assert cp_metrics.meterset_weight.sum() == pytest.approx(1.0)
+
+        cpm = cp_metrics[1]
+        assert cpm.control_point_index == 1
+        # 20 leaves inside the Y jaws × 30 mm gap × 5 mm width
+        assert cpm.aperture_area == pytest.approx(20 * 30.0 * 5.0)
+        assert cpm.small_aperture_flags.below_20mm is False
+        assert cpm.PAM is None
+
+        # Smallest gap is 20 mm, which is not below any threshold
+        assert not cp_metrics.below_20mm.any()
+        assert ControlPointArray.from_list(cp_metrics.to_list()) == cp_metrics
+
 
 class TestPlanMetrics:
     """Test plan-level metrics calculation."""
     
-    def create_simple_plan(self) -> RTPlan:
-        """Create a simple plan for testing."""
-        control_points = [
-            ControlPoint(
-                index=0,
-                gantry_angle=0.0,
-                gantry_rotation_direction="CW",
-                beam_limiting_device_angle=0.0,
-                cumulative_meterset_weight=0.0,
-                mlc_positions=MLCLeafPositions(
-                    bank_a=[-10.0] * 60,
-                    bank_b=[10.0] * 60,
-                ),
-                jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-            ),
-            ControlPoint(
-                index=1,
-                gantry_angle=180.0,
-                gantry_rotation_direction="CW",
-                beam_limiting_device_angle=0.0,
-                cumulative_meterset_weight=1.0,
-                mlc_positions=MLCLeafPositions(
-                    bank_a=[-20.0] * 60,
-                    bank_b=[20.0] * 60,
-                ),
-                jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-            ),
-        ]
-        
-        beam = Beam(
-            beam_number=1,
-            beam_name="Arc 1",
-            beam_type="DYNAMIC",
-            radiation_type="PHOTON",
-            treatment_delivery_type="TREATMENT",
-            number_of_control_points=2,
-            control_points=control_points,
-            final_cumulative_meterset_weight=1.0,
-            beam_dose=500.0,
-            gantry_angle_start=0.0,
-            gantry_angle_end=180.0,
-            is_arc=True,
-            mlc_leaf_widths=[5.0] * 60,
-            number_of_leaves=60,
-        )
-        
-        return RTPlan(
-            patient_id="TEST",
-            patient_name="Test",
-            plan_label="Test Plan",
-            plan_name="Test",
-            beams=[beam],
-            fraction_groups=[],
-            total_mu=500.0,
-            technique=Technique.VMAT,
-        )
-    
-    def test_plan_metrics_calculation(self):
+    def test_plan_metrics_calculation(self, simple_plan):
         """Test plan metrics calculation."""
-        plan = self.create_simple_plan()
-        metrics = calculate_plan_metrics(plan)
+        metrics = calculate_plan_metrics(simple_plan)
         
         assert metrics.plan_label == "Test Plan"
         assert metrics.total_mu == 500.0
@@ -283,51 +306,55 @@ class TestPlanMetrics:
         assert metrics.LT >= 0.0
 
 
+def _parse_one(path: str):
+    """Parse a plan and compute its metrics (runs in a worker process)."""
+    return calculate_plan_metrics(parse_rtplan(path))
+
+
+@pytest.fixture(scope="module")
+def reference_data():
+    """Load reference data if available."""
+    ref_path = Path(__file__).parent / "reference_data" / "expected_metrics.json"
+    if not ref_path.exists():
+        pytest.skip("Reference data not found. Run generate_reference_data.ts first.")
+    
+    with open(ref_path) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def test_data_dir():
+    """Get test data directory."""
+    candidates = [
+        Path(__file__).parent.parent.parent / "public" / "test-data",
+    ]
+    for path in candidates:
+        if path.exists():
+            return path
+    pytest.skip("Test data directory not found")
+
+
+@pytest.fixture(scope="module")
+def parsed_plans(reference_data, test_data_dir):
+    """Metrics for every available reference plan, computed in parallel."""
+    filenames = [fn for fn in reference_data if (test_data_dir / fn).exists()]
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(_parse_one, [str(test_data_dir / fn) for fn in filenames])
+        return dict(zip(filenames, results))
+
+
 class TestReferenceData:
     """Test metrics against reference data from TypeScript."""
     
-    @pytest.fixture
-    def reference_data(self):
-        """Load reference data if available."""
-        ref_path = Path(__file__).parent / "reference_data" / "expected_metrics.json"
-        if not ref_path.exists():
-            pytest.skip("Reference data not found. Run generate_reference_data.ts first.")
-        
-        with open(ref_path) as f:
-            return json.load(f)
-    
-    @pytest.fixture
-    def test_data_dir(self):
-        """Get test data directory."""
-        candidates = [
-            Path(__file__).parent.parent.parent / "public" / "test-data",
-        ]
-        for path in candidates:
-            if path.exists():
-                return path
-        pytest.skip("Test data directory not found")
-    
-    def test_metrics_match_reference(self, reference_data, test_data_dir):
+    @pytest.mark.parametrize("metric", ["MCS", "LSV", "AAV", "MFA"])
+    def test_metrics_match_reference(self, reference_data, parsed_plans, metric):
         """Test that calculated metrics match TypeScript reference."""
         tolerance = 1e-4  # Allow small floating-point differences
         
-        for filename, expected in reference_data.items():
-            file_path = test_data_dir / filename
-            if not file_path.exists():
-                continue
-            
-            plan = parse_rtplan(str(file_path))
-            metrics = calculate_plan_metrics(plan)
-            
-            # Compare primary metrics
-            assert metrics.MCS == pytest.approx(expected["MCS"], abs=tolerance), \
-                f"{filename}: MCS mismatch"
-            assert metrics.LSV == pytest.approx(expected["LSV"], abs=tolerance), \
-                f"{filename}: LSV mismatch"
-            assert metrics.AAV == pytest.approx(expected["AAV"], abs=tolerance), \
-                f"{filename}: AAV mismatch"
-            assert metrics.MFA == pytest.approx(expected["MFA"], abs=tolerance), \
-                f"{filename}: MFA mismatch"
+        for filename, metrics in parsed_plans.items():
+            expected = reference_data[filename]
+            assert getattr(metrics, metric) == pytest.approx(expected[metric], abs=tolerance), \
+                f"{filename}: {metric} mismatch"
 
 
 if __name__ == "__main__":
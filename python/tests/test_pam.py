@@ -10,6 +10,7 @@ Tests PAM calculation functions including:
 
 import pytest
 import math
+import numpy as np
 from pathlib import Path
 import sys
 
@@ -67,6 +68,15 @@ class TestBEVProjection:
         # X-axis inverts (cos(180°)=-1), Z projects to -X (sin(180°)≈0)
         assert x_bev == pytest.approx(-10.0, abs=0.01)
         assert y_bev == pytest.approx(20.0, abs=0.01)
+    
+    def test_project_points_to_bev_array(self):
+        """Test that an (N, 3) array projects like the individual points."""
+        points = np.array([(10.0, 20.0, 5.0), (-3.0, 1.0, 7.0)])
+        bev = project_point_to_bev(points, gantry_angle_deg=30.0)
+        
+        assert bev.shape == (2, 2)
+        for point, row in zip(points, bev):
+            assert tuple(row) == pytest.approx(project_point_to_bev(tuple(point), 30.0))
 
 
 class TestBEVPolygonGeneration:
@@ -193,72 +203,83 @@ class TestApertureModulation:
         
         # 50% overlap = 50% unblocked = AM = 0.5
         assert am == pytest.approx(0.5, abs=0.01)
+    
+    def test_aperture_modulation_rectangle_matches_overlay(self):
+        """Test the rectangular-aperture path against a general intersection."""
+        from shapely.geometry import Point, Polygon
+        
+        target_poly = Point(2.0, -1.0).buffer(8.0)
+        aperture_poly = Polygon([[-3, -20], [5, -20], [5, 4], [-3, 4]])
+        
+        am = calculate_aperture_modulation(target_poly, aperture_poly)
+        
+        expected = 1.0 - target_poly.intersection(aperture_poly).area / target_poly.area
+        assert am == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.fixture(scope="module")
+def target_structure():
+    """Simple test structure (10x10 box at isocenter)."""
+    contour_points = [
+        (-5.0, -5.0, 0.0),
+        (5.0, -5.0, 0.0),
+        (5.0, 5.0, 0.0),
+        (-5.0, 5.0, 0.0),
+    ]
+    contour = ContourSequence(points=contour_points)
+    return Structure(name="Target", number=1, contours=[contour])
+
+
+@pytest.fixture(scope="module")
+def static_beam():
+    """Simple static test beam with an open symmetric aperture."""
+    # Single control point with symmetric aperture
+    cp1 = ControlPoint(
+        index=0,
+        gantry_angle=0.0,
+        gantry_rotation_direction="NONE",
+        beam_limiting_device_angle=0.0,
+        cumulative_meterset_weight=0.0,
+        mlc_positions=MLCLeafPositions(bank_a=[-10.0], bank_b=[10.0]),
+        jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+    )
+    cp2 = ControlPoint(
+        index=1,
+        gantry_angle=0.0,
+        gantry_rotation_direction="NONE",
+        beam_limiting_device_angle=0.0,
+        cumulative_meterset_weight=1.0,
+        mlc_positions=MLCLeafPositions(bank_a=[-10.0], bank_b=[10.0]),
+        jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+    )
+    
+    beam = Beam(
+        beam_number=1,
+        beam_name="Beam 1",
+        beam_type="STATIC",
+        radiation_type="PHOTON",
+        treatment_delivery_type="TREATMENT",
+        number_of_control_points=2,
+        control_points=[cp1, cp2],
+        number_of_leaves=1,
+        mlc_leaf_widths=[20.0],
+        mlc_leaf_boundaries=[-10.0, 10.0],
+    )
+    return beam
 
 
 class TestPAMCalculation:
     """Test complete PAM/BAM calculation."""
     
-    def create_test_structure(self):
-        """Helper to create a simple test structure (10x10 box at isocenter)."""
-        contour_points = [
-            (-5.0, -5.0, 0.0),
-            (5.0, -5.0, 0.0),
-            (5.0, 5.0, 0.0),
-            (-5.0, 5.0, 0.0),
-        ]
-        contour = ContourSequence(points=contour_points)
-        return Structure(name="Target", number=1, contours=[contour])
-    
-    def create_test_beam(self):
-        """Helper to create a simple test beam."""
-        # Single control point with symmetric aperture
-        cp1 = ControlPoint(
-            index=0,
-            gantry_angle=0.0,
-            gantry_rotation_direction="NONE",
-            beam_limiting_device_angle=0.0,
-            cumulative_meterset_weight=0.0,
-            mlc_positions=MLCLeafPositions(bank_a=[-10.0], bank_b=[10.0]),
-            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-        )
-        cp2 = ControlPoint(
-            index=1,
-            gantry_angle=0.0,
-            gantry_rotation_direction="NONE",
-            beam_limiting_device_angle=0.0,
-            cumulative_meterset_weight=1.0,
-            mlc_positions=MLCLeafPositions(bank_a=[-10.0], bank_b=[10.0]),
-            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-        )
-        
-        beam = Beam(
-            beam_number=1,
-            beam_name="Beam 1",
-            beam_type="STATIC",
-            radiation_type="PHOTON",
-            treatment_delivery_type="TREATMENT",
-            number_of_control_points=2,
-            control_points=[cp1, cp2],
-            number_of_leaves=1,
-            mlc_leaf_widths=[20.0],
-            mlc_leaf_boundaries=[-10.0, 10.0],
-        )
-        return beam
-    
-    def test_pam_fully_unblocked(self):
+    def test_pam_fully_unblocked(self, target_structure, static_beam):
         """Test PAM when target is fully unblocked."""
-        structure = self.create_test_structure()
-        beam = self.create_test_beam()
-        
         # With large aperture, target should be fully unblocked
-        am = calculate_pam_control_point(structure, beam, 1)
+        am = calculate_pam_control_point(target_structure, static_beam, 1)
         assert am is not None
         assert am == pytest.approx(0.0, abs=0.01)
     
-    def test_pam_fully_blocked(self):
+    def test_pam_fully_blocked(self, target_structure):
         """Test PAM when target is fully blocked by MLC."""
-        structure = self.create_test_structure()
-        
         # Create beam where both MLCs are closed
         cp1 = ControlPoint(
             index=0,
@@ -292,35 +313,54 @@ class TestPAMCalculation:
             mlc_leaf_boundaries=[-10.0, 10.0],
         )
         
-        am = calculate_pam_control_point(structure, beam, 1)
+        am = calculate_pam_control_point(target_structure, beam, 1)
         # With closed aperture, target fully blocked
         assert am == pytest.approx(1.0, abs=0.01)
     
-    def test_bam_calculation(self):
+    def test_bam_calculation(self, target_structure, static_beam):
         """Test BAM (Beam Aperture Modulation) calculation."""
-        structure = self.create_test_structure()
-        beam = self.create_test_beam()
-        
-        bam = calculate_pam_beam(structure, beam)
+        bam = calculate_pam_beam(target_structure, static_beam)
         
         assert bam is not None
         # With large aperture, target fully unblocked
         assert bam == pytest.approx(0.0, abs=0.05)
-    
-    def test_pam_calculation(self):
-        """Test full PAM calculation with complete plan."""
-        structure = self.create_test_structure()
-        beam = self.create_test_beam()
+
+    def test_bam_aperture_cache(self, target_structure, static_beam):
+        """Test BAM reuses cached aperture polygons across calls."""
+        cache = {}
+
+        bam = calculate_pam_beam(target_structure, static_beam, aperture_cache=cache)
+        assert set(cache) == {(1, 0), (1, 1)}
+
+        # Cached apertures are used instead of the control point MLC data
+        cache[(1, 0)] = cache[(1, 1)] = None
+        assert calculate_pam_beam(target_structure, static_beam, aperture_cache=cache) == pytest.approx(1.0)
+        assert calculate_pam_beam(target_structure, static_beam) == pytest.approx(bam)
+
+    def test_am_target_cache(self, target_structure, static_beam):
+        """Test control points at the same gantry angle share one target projection."""
+        cache = {}
         
+        ams = [
+            calculate_pam_control_point(target_structure, static_beam, i, target_cache=cache)
+            for i in range(2)
+        ]
+        assert list(cache) == [(static_beam.control_points[0].gantry_angle, 0.0)]
+        assert ams == [
+            calculate_pam_control_point(target_structure, static_beam, i) for i in range(2)
+        ]
+
+    def test_pam_calculation(self, target_structure, static_beam):
+        """Test full PAM calculation with complete plan."""
         plan = RTPlan(
             patient_id="TEST001",
             patient_name="Test Patient",
             plan_label="TestPlan",
             plan_name="TestPlan",
-            beams=[beam],
+            beams=[static_beam],
         )
         
-        pam = calculate_pam_plan(plan, structure)
+        pam = calculate_pam_plan(plan, target_structure)
         
         assert pam is not None
         # With large aperture, target fully unblocked
@@ -5,6 +5,7 @@ Tests DICOM RT Plan parsing against reference data.
 """
 
 import pytest
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import sys
 
@@ -48,6 +49,15 @@ class TestParser:
         assert Technique.UNKNOWN.value == "UNKNOWN"
 
 
+def _parse_safe(path: str):
+    """Parse one file in a worker process; returns (name, status, data)."""
+    name = Path(path).name
+    try:
+        return name, "OK", parse_rtplan(path)
+    except Exception as e:
+        return name, "FAILED", str(e)
+
+
 class TestParserWithFiles:
     """Test cases that require actual DICOM files."""
     
@@ -92,13 +102,9 @@ class TestParserWithFiles:
         if not dcm_files:
             pytest.skip("No DICOM files in test data directory")
         
-        results = []
-        for file_path in dcm_files:
-            try:
-                plan = parse_rtplan(str(file_path))
-                results.append((file_path.name, "OK", plan))
-            except Exception as e:
-                results.append((file_path.name, "FAILED", str(e)))
+        # Files are independent, so parse them in parallel
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_parse_safe, [str(p) for p in dcm_files]))
         
         # At least some files should parse successfully
         successful = [r for r in results if r[1] == "OK"]
@@ -110,6 +116,27 @@ class TestParserWithFiles:
                 print(f"  {name}: {len(data.beams)} beams, {data.technique.value}")
             else:
                 print(f"  {name}: {status} - {data}")
+    
+    def test_parse_cached(self, test_data_dir):
+        """Test that cached parses are equal but independent of each other."""
+        dcm_files = list(test_data_dir.glob("*.dcm"))
+        
+        if not dcm_files:
+            pytest.skip("No DICOM files in test data directory")
+        
+        path = str(dcm_files[0])
+        first = parse_rtplan(path, cache=True)
+        n_beams = len(first.beams)
+        first.beams.clear()
+        
+        # Mutating one result must not leak into later cached parses
+        second = parse_rtplan(path, cache=True)
+        assert len(second.beams) == n_beams
+        assert second.beams == parse_rtplan(path).beams
+        
+        third = parse_rtplan(path, cache=True)
+        assert third.beams is not second.beams
+        assert third.beams[0].control_points[0] is not second.beams[0].control_points[0]
 
 
 class TestMLCParsing:
@@ -128,6 +155,19 @@ class TestMLCParsing:
         assert len(mlc.bank_b) == 3
         assert mlc.bank_a[0] == -50.0
         assert mlc.bank_b[0] == 50.0
+    
+    def test_mlc_positions_arrays(self):
+        """Test bank arrays are cached and follow reassigned banks."""
+        from rtplan_complexity.types import MLCLeafPositions
+        
+        mlc = MLCLeafPositions(bank_a=[-50.0, -45.0], bank_b=[50.0, 45.0])
+        
+        assert mlc.bank_a_np.tolist() == [-50.0, -45.0]
+        assert mlc.bank_a_np is mlc.bank_a_np
+        
+        # The parser assigns banks after construction
+        mlc.bank_b = [10.0, 20.0]
+        assert mlc.bank_b_np.tolist() == [10.0, 20.0]
 
 
 if __name__ == "__main__":
@@ -1,63 +1,75 @@
 """Test AAV with per-leaf max gap (union aperture) as A_max."""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import pydicom
 import numpy as np
-import openpyxl
 import os
 import glob
 
-# Load UCoMx reference
-wb = openpyxl.load_workbook(
-    r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\0-all-20262822356.397\dataset.xlsx'
+from _ucomx_reference import (
+    LINAC_DIR, MLC_TYPES, PLAN_TAGS, UCOMX_XLSX, find_reference, load_ucomx_reference,
 )
-ws = wb.active
-headers = [c.value for c in ws[1]]
-ucomx_rows = []
-for row in ws.iter_rows(min_row=2):
-    d = {h: row[i].value for i, h in enumerate(headers)}
-    ucomx_rows.append(d)
-
-
-def lsv_bank(positions, active_mask):
-    idx = np.where(active_mask)[0]
-    if len(idx) < 2:
-        return 1.0
-    diffs = np.abs(np.diff(positions[idx]))
-    mx = np.max(diffs)
-    return np.mean(1.0 - diffs / mx) if mx > 0 else 1.0
-
-
-def compute_aav_variants(dcm_path):
-    """Compute AAV with different A_max definitions."""
-    ds = pydicom.dcmread(dcm_path)
+
+
+def _compute_beam(A, B, Y, bounds, min_gap, n_pairs):
+    """Per-CA aperture areas and per-leaf maxima from stacked CP bank (A, B) and Y-jaw rows."""
+    # Build CAs with midpoint interpolation, one row per CA
+    ca_a = (A[:-1] + A[1:]) / 2
+    ca_b = (B[:-1] + B[1:]) / 2
+    # Dual-layer MLCs can report more leaves than the first boundary table
+    ca_gaps = (ca_b - ca_a)[:, :n_pairs]
+    ca_y = (Y[:-1] + Y[1:]) / 2
+
+    leaf_bot, leaf_top = bounds[:-1], bounds[1:]
+    y_lo, y_hi = ca_y[:, 0:1], ca_y[:, 1:2]
+    within_jaw = (leaf_top > y_lo) & (leaf_bot < y_hi)
+    active = within_jaw & (ca_gaps > min_gap)
+    eff_w = np.clip(np.minimum(leaf_top, y_hi) - np.maximum(leaf_bot, y_lo), 0, None)
+    contrib = ca_gaps * eff_w * active
+    areas = contrib.sum(axis=1)
+
+    # Track per-leaf max gap for union aperture
+    per_leaf_max_gap = np.maximum((ca_gaps * active).max(axis=0), 0)
+    per_leaf_max_area_contrib = np.maximum(contrib.max(axis=0), 0)  # gap × effective_width
+    return areas, per_leaf_max_gap, per_leaf_max_area_contrib
+
+
+def compute_aav_variants(ds):
+    """Compute AAV with different A_max definitions (an already-read plan Dataset)."""
     beam_results = []
 
+    bounds_cache = {}  # (machine, n_pairs) -> leaf boundaries, shared by the plan's beams
     for beam in ds.BeamSequence:
         bounds = None
         n_pairs = None
         for bld in beam.BeamLimitingDeviceSequence:
-            if bld.RTBeamLimitingDeviceType in ('MLCX', 'MLCY'):
-                bounds = np.array(bld.LeafPositionBoundaries)
+            if bld.RTBeamLimitingDeviceType in MLC_TYPES:
                 n_pairs = bld.NumberOfLeafJawPairs
+                key = (beam.get('TreatmentMachineName', ''), n_pairs)
+                bounds = bounds_cache.get(key)
+                if bounds is None:
+                    bounds = bounds_cache[key] = np.asarray(bld.LeafPositionBoundaries, dtype=np.float64)
                 break
         if bounds is None:
             continue
 
-        # Parse CPs
-        cp_data = []
+        # Parse CPs into per-field rows
+        a_rows, b_rows, y_rows = [], [], []
         prev_mlc = None
         prev_y = None
-        all_gaps = []
         for cp in beam.ControlPointSequence:
             mlc = None
             y = prev_y
-            if hasattr(cp, 'BeamLimitingDevicePositionSequence'):
+            if 'BeamLimitingDevicePositionSequence' in cp:
                 for bldp in cp.BeamLimitingDevicePositionSequence:
-                    if bldp.RTBeamLimitingDeviceType in ('MLCX', 'MLCY'):
-                        pos = np.array(bldp.LeafJawPositions, dtype=float)
+                    device = bldp.RTBeamLimitingDeviceType
+                    if device in MLC_TYPES:
+                        pos = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
                         half = len(pos) // 2
                         mlc = (pos[:half], pos[half:])
-                    elif bldp.RTBeamLimitingDeviceType == 'ASYMY':
-                        y = np.array(bldp.LeafJawPositions, dtype=float)
+                    elif device == 'ASYMY':
+                        y = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
             if mlc is None:
                 mlc = prev_mlc
             if y is None:
@@ -65,63 +77,27 @@ def compute_aav_variants(dcm_path):
             if mlc is None:
                 continue
 
-            gaps = mlc[1] - mlc[0]
-            all_gaps.extend(gaps.tolist())
-            w = float(cp.CumulativeMetersetWeight) if hasattr(cp, 'CumulativeMetersetWeight') else 0
-            cp_data.append({
-                'a': mlc[0].copy(), 'b': mlc[1].copy(),
-                'gaps': gaps.copy(),
-                'y': y.copy() if y is not None else np.array([-200, 200]),
-                'w': w
-            })
+            a_rows.append(mlc[0])
+            b_rows.append(mlc[1])
+            y_rows.append(y if y is not None else (-200.0, 200.0))
             prev_mlc = mlc
             prev_y = y
 
-        min_gap = min(all_gaps) if all_gaps else 0
-        n_ca = len(cp_data) - 1
-        if n_ca == 0:
+        n_ca = len(a_rows) - 1
+        if n_ca < 1:
             continue
+        A, B, Y = np.stack(a_rows), np.stack(b_rows), np.array(y_rows, dtype=float)
+        min_gap = float((B - A).min())
+
+        areas, per_leaf_max_gap, per_leaf_max_area_contrib = _compute_beam(A, B, Y, bounds, min_gap, n_pairs)
 
-        # Build CAs with midpoint interpolation
-        # Track per-leaf max gap for union aperture
-        per_leaf_max_gap = np.zeros(n_pairs)
-        per_leaf_max_area_contrib = np.zeros(n_pairs)  # gap × effective_width
-
-        areas = []
-        for j in range(n_ca):
-            cp1, cp2 = cp_data[j], cp_data[j + 1]
-            ca_a = (cp1['a'] + cp2['a']) / 2
-            ca_b = (cp1['b'] + cp2['b']) / 2
-            ca_gaps = ca_b - ca_a
-            ca_y = (cp1['y'] + cp2['y']) / 2
-
-            area = 0
-            active = np.zeros(n_pairs, dtype=bool)
-            for k in range(n_pairs):
-                within_jaw = (bounds[k + 1] > ca_y[0]) and (bounds[k] < ca_y[1])
-                if within_jaw and ca_gaps[k] > min_gap:
-                    active[k] = True
-                    eff_w = max(0, min(bounds[k + 1], ca_y[1]) - max(bounds[k], ca_y[0]))
-                    contrib = ca_gaps[k] * eff_w
-                    area += contrib
-                    # Track per-leaf maximums
-                    if ca_gaps[k] > per_leaf_max_gap[k]:
-                        per_leaf_max_gap[k] = ca_gaps[k]
-                    if contrib > per_leaf_max_area_contrib[k]:
-                        per_leaf_max_area_contrib[k] = contrib
-            areas.append(area)
-
-        areas = np.array(areas)
         a_max_global = np.max(areas)  # max single-CP area
         a_max_union = np.sum(per_leaf_max_area_contrib)  # per-leaf max gap × width
-        a_max_union_gap = 0
         # Compute union using per-leaf max gap and a fixed jaw for simplicity
-        ca_y = (cp_data[0]['y'] + cp_data[-1]['y']) / 2
-        for k in range(n_pairs):
-            within_jaw = (bounds[k + 1] > ca_y[0]) and (bounds[k] < ca_y[1])
-            if within_jaw and per_leaf_max_gap[k] > min_gap:
-                eff_w = max(0, min(bounds[k + 1], ca_y[1]) - max(bounds[k], ca_y[0]))
-                a_max_union_gap += per_leaf_max_gap[k] * eff_w
+        # (leaves outside the jaw get zero effective width, so no separate jaw mask)
+        y_plan = (Y[0] + Y[-1]) / 2
+        eff_w_plan = np.clip(np.minimum(bounds[1:], y_plan[1]) - np.maximum(bounds[:-1], y_plan[0]), 0, None)
+        a_max_union_gap = np.sum(per_leaf_max_gap * eff_w_plan * (per_leaf_max_gap > min_gap))
 
         mean_area = np.mean(areas)
         beam_results.append({
@@ -147,45 +123,51 @@ def compute_aav_variants(dcm_path):
     return None
 
 
-base = r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\Linac'
-plans = sorted(glob.glob(os.path.join(base, '*', 'RTPLAN_*.dcm')))
-
-print(f"{'Plan':<16} {'AAV_glob':>8} {'AAV_uni':>8} {'AAV_ref':>8} | {'ratio_g':>8} {'ratio_u':>8} | {'Amax_g':>8} {'Amax_u':>8} {'m_area':>8}")
-print("-" * 110)
-
-for plan_path in plans:
+def process_plan(plan_path, ucomx_ref):
+    """Compare one plan's AAV variants against its UCoMx row; returns the report line, or None to skip it."""
     name = os.path.basename(plan_path).replace('RTPLAN_', '').replace('.dcm', '')
 
-    ds = pydicom.dcmread(plan_path)
+    ds = pydicom.dcmread(plan_path, stop_before_pixels=True, specific_tags=PLAN_TAGS)
     total_mu = 0
     for fb in ds.FractionGroupSequence:
         for rb in fb.ReferencedBeamSequence:
-            if hasattr(rb, 'BeamMeterset'):
+            if 'BeamMeterset' in rb:
                 total_mu += float(rb.BeamMeterset)
 
-    ref = None
-    for r in ucomx_rows:
-        if abs(r['MUs'] - total_mu) < 1:
-            ref = r
-            break
+    ref = find_reference(ucomx_ref['MUs'], total_mu)
     if ref is None:
-        continue
+        return None
 
-    ref_aav = ref.get('AAV')
-    if ref_aav is None:
-        continue
+    ref_aav = ucomx_ref['AAV'][ref]
+    if np.isnan(ref_aav):
+        return None
 
     try:
-        comp = compute_aav_variants(plan_path)
+        comp = compute_aav_variants(ds)
         if comp is None:
-            continue
+            return None
 
         r_g = comp['aav_global'] / ref_aav if ref_aav else 0
         r_u = comp['aav_union'] / ref_aav if ref_aav else 0
 
-        print(f"{name:<16} {comp['aav_global']:8.4f} {comp['aav_union']:8.4f} {ref_aav:8.4f} | "
-              f"{r_g:8.4f} {r_u:8.4f} | "
-              f"{comp['a_max_global']:8.0f} {comp['a_max_union']:8.0f} {comp['mean_area']:8.0f}")
+        return (f"{name:<16} {comp['aav_global']:8.4f} {comp['aav_union']:8.4f} {ref_aav:8.4f} | "
+                f"{r_g:8.4f} {r_u:8.4f} | "
+                f"{comp['a_max_global']:8.0f} {comp['a_max_union']:8.0f} {comp['mean_area']:8.0f}")
     except Exception as e:
         import traceback; traceback.print_exc()
-        print(f"{name:<16} ERROR: {e}")
+        return f"{name:<16} ERROR: {e}"
+
+
+if __name__ == '__main__':
+    # Load UCoMx reference
+    ucomx_ref = load_ucomx_reference(UCOMX_XLSX)
+    plans = sorted(glob.glob(os.path.join(LINAC_DIR, '*', 'RTPLAN_*.dcm')))
+
+    print(f"{'Plan':<16} {'AAV_glob':>8} {'AAV_uni':>8} {'AAV_ref':>8} | {'ratio_g':>8} {'ratio_u':>8} | {'Amax_g':>8} {'Amax_u':>8} {'m_area':>8}")
+    print("-" * 110)
+
+    # One plan per worker; lines print in plan order as they complete
+    with ProcessPoolExecutor() as executor:
+        for line in executor.map(partial(process_plan, ucomx_ref=ucomx_ref), plans):
+            if line is not None:
+                print(line)
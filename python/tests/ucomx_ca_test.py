@@ -2,30 +2,40 @@
 import pydicom
 import numpy as np
 
-ds = pydicom.dcmread(r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\Linac\Monaco\RTPLAN_MO_PT_01.dcm')
+import _cp_parser  # noqa: F401  (DS/IS values as NumPy arrays)
+from _metrics_probe import lsv_banks
+
+ds = pydicom.dcmread(
+    r'C:\Users\teoir\OneDrive\Desktop\rt-complexity-lens\testdata\reference_dataset_v1.1\Linac\Monaco\RTPLAN_MO_PT_01.dcm',
+    stop_before_pixels=True, specific_tags=['BeamSequence', 'FractionGroupSequence'],
+)
 beam = ds.BeamSequence[0]
 n_pairs = 80
 
 for bld in beam.BeamLimitingDeviceSequence:
     if bld.RTBeamLimitingDeviceType == 'MLCX':
-        bounds = np.array(bld.LeafPositionBoundaries)
+        bounds = np.asarray(bld.LeafPositionBoundaries, dtype=np.float64)
+leaf_top = bounds[1:]
+leaf_bot = bounds[:-1]
+leaf_width = leaf_top - leaf_bot
 
 # Parse all CPs
 cp_data = []
 prev_mlc = None
 prev_y = None
-all_gaps = []  # collect all gaps to find min_gap
+min_gap = np.inf  # minimum gap across entire plan (used for active leaf filtering)
 for i, cp in enumerate(beam.ControlPointSequence):
     mlc = None
     y = prev_y
-    if hasattr(cp, 'BeamLimitingDevicePositionSequence'):
+    if 'BeamLimitingDevicePositionSequence' in cp:
         for bldp in cp.BeamLimitingDevicePositionSequence:
-            if bldp.RTBeamLimitingDeviceType == 'MLCX':
-                pos = np.array(bldp.LeafJawPositions, dtype=float)
+            device = bldp.RTBeamLimitingDeviceType
+            if device == 'MLCX':
+                pos = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
                 half = len(pos) // 2
                 mlc = (pos[:half], pos[half:])
-            elif bldp.RTBeamLimitingDeviceType == 'ASYMY':
-                y = np.array(bldp.LeafJawPositions, dtype=float)
+            elif device == 'ASYMY':
+                y = np.asarray(bldp.LeafJawPositions, dtype=np.float64)
     if mlc is None:
         mlc = prev_mlc
     if y is None:
@@ -33,13 +43,13 @@ for i, cp in enumerate(beam.ControlPointSequence):
 
     bankA, bankB = mlc
     gaps = bankB - bankA
-    all_gaps.extend(gaps.tolist())
+    min_gap = min(min_gap, float(gaps.min()))
 
-    w = float(cp.CumulativeMetersetWeight) if hasattr(cp, 'CumulativeMetersetWeight') else 0
+    w = float(cp.CumulativeMetersetWeight) if 'CumulativeMetersetWeight' in cp else 0
 
     cp_data.append({
-        'a': bankA.copy(), 'b': bankB.copy(),
-        'gaps': gaps.copy(), 'y': y.copy(), 'w': w
+        'a': bankA, 'b': bankB,
+        'gaps': gaps, 'y': y, 'w': w
     })
     prev_mlc = mlc
     prev_y = y
@@ -47,8 +57,6 @@ for i, cp in enumerate(beam.ControlPointSequence):
 n_cp = len(cp_data)
 n_ca = n_cp - 1  # number of control arcs
 
-# min_gap: minimum gap across entire plan (used for active leaf filtering)
-min_gap = min(all_gaps)
 print(f"Min gap in plan: {min_gap:.4f} mm")
 print(f"Number of CPs: {n_cp}, Number of CAs: {n_ca}")
 
@@ -67,32 +75,22 @@ for j in range(n_ca):
     ca_mu = cp2['w'] - cp1['w']
 
     # Active leaf mask: gap > min_gap AND within Y-jaw
-    active = np.zeros(n_pairs, dtype=bool)
-    for k in range(n_pairs):
-        leaf_top = bounds[k + 1]
-        leaf_bot = bounds[k]
-        within_jaw = (leaf_top > ca_y[0]) and (leaf_bot < ca_y[1])
-        gap_open = ca_gaps[k] > min_gap
-        if within_jaw and gap_open:
-            active[k] = True
+    within_jaw = (leaf_top > ca_y[0]) & (leaf_bot < ca_y[1])
+    active = within_jaw & (ca_gaps[:n_pairs] > min_gap)
 
     ca_data.append({
         'a': ca_a, 'b': ca_b, 'gaps': ca_gaps,
         'y': ca_y, 'mu': ca_mu, 'active': active
     })
 
-total_mu = sum(ca['mu'] for ca in ca_data)
+mu_weights = np.array([ca['mu'] for ca in ca_data])
+total_mu = np.sum(mu_weights)
 
 # Compute areas per CA (active leaves only)
-areas = []
-for ca in ca_data:
-    area = 0
-    for k in range(n_pairs):
-        if ca['active'][k]:
-            lw = bounds[k + 1] - bounds[k]
-            area += ca['gaps'][k] * lw  # gap already > 0 due to active filter
-    areas.append(area)
-areas = np.array(areas)
+areas = np.array([
+    np.sum(ca['gaps'][:n_pairs] * leaf_width * ca['active'])  # gap already > 0 due to active filter
+    for ca in ca_data
+])
 a_max = np.max(areas)
 
 print(f"Max area: {a_max:.1f} mm²")
@@ -104,24 +102,9 @@ print()
 
 
 # ========== LSV per CA (Masi/McNiven position-based per-bank) ==========
-def lsv_bank(positions, active_mask):
-    """LSV for one bank = mean(1 - |diff| / max_diff) over active adjacent pairs."""
-    idx = np.where(active_mask)[0]
-    if len(idx) < 2:
-        return 1.0
-    diffs = np.abs(np.diff(positions[idx]))
-    max_diff = np.max(diffs)
-    if max_diff == 0:
-        return 1.0
-    return np.mean(1.0 - diffs / max_diff)
-
-
-lsv_per_ca = []
-for ca in ca_data:
-    lsv_a = lsv_bank(ca['a'], ca['active'])
-    lsv_b = lsv_bank(ca['b'], ca['active'])
-    lsv_per_ca.append((lsv_a + lsv_b) / 2)
-lsv_per_ca = np.array(lsv_per_ca)
+ca_active = np.stack([ca['active'] for ca in ca_data])
+lsv_per_ca = (lsv_banks(np.stack([ca['a'] for ca in ca_data]), ca_active) +
+              lsv_banks(np.stack([ca['b'] for ca in ca_data]), ca_active)) / 2
 
 # AAV per CA  
 aav_per_ca = areas / a_max  # McNiven: A_ca / A_max
@@ -135,7 +118,6 @@ aav_eq1 = np.mean(aav_per_ca)
 mcs_eq1 = np.mean(mcs_per_ca)
 
 # Plan values using equation (2): MU-weighted
-mu_weights = np.array([ca['mu'] for ca in ca_data])
 lsv_eq2 = np.sum(lsv_per_ca * mu_weights) / total_mu if total_mu > 0 else 0
 aav_eq2 = np.sum(aav_per_ca * mu_weights) / total_mu if total_mu > 0 else 0
 mcs_eq2 = np.sum(mcs_per_ca * mu_weights) / total_mu if total_mu > 0 else 0
@@ -160,16 +142,15 @@ print(f"  LSV_eq1 × AAV_eq1 = {lsv_eq1 * aav_eq1:.6f}")
 print()
 
 # ========== Leaf Travel (LT) ==========
-lt_active = 0
-lt_total = 0
-for j in range(n_ca):
-    cp1, cp2 = cp_data[j], cp_data[j + 1]
-    ca = ca_data[j]
-    for k in range(n_pairs):
-        travel = abs(cp2['a'][k] - cp1['a'][k]) + abs(cp2['b'][k] - cp1['b'][k])
-        lt_total += travel
-        if ca['active'][k]:
-            lt_active += travel
+# Per-CA, per-leaf travel of both banks between the CA's two CPs
+A = np.stack([cp['a'][:n_pairs] for cp in cp_data])
+B = np.stack([cp['b'][:n_pairs] for cp in cp_data])
+active_mat = np.stack([ca['active'] for ca in ca_data])
+travel = np.abs(A[1:] - A[:-1]) + np.abs(B[1:] - B[:-1])
+active_travel = travel * active_mat
+
+lt_total = travel.sum()
+lt_active = active_travel.sum()
 
 lt_per_ca = lt_active / n_ca
 print(f"=== Leaf Travel ===")
@@ -188,18 +169,10 @@ print()
 
 # ========== Try: LT = average across CAs of (per-CA active leaf travel) ==========
 # UCoMx might compute LT as: for each CA, sum of active leaf travel for both banks, then average over CAs
-lt_per_ca_values = []
-for j in range(n_ca):
-    cp1, cp2 = cp_data[j], cp_data[j + 1]
-    ca = ca_data[j]
-    ca_lt = 0
-    for k in range(n_pairs):
-        if ca['active'][k]:
-            ca_lt += abs(cp2['a'][k] - cp1['a'][k]) + abs(cp2['b'][k] - cp1['b'][k])
-    lt_per_ca_values.append(ca_lt)
+lt_per_ca_values = active_travel.sum(axis=1)
 
 lt_avg_ca = np.mean(lt_per_ca_values)
-lt_mu_ca = np.sum(np.array(lt_per_ca_values) * mu_weights) / total_mu if total_mu > 0 else 0
+lt_mu_ca = np.sum(lt_per_ca_values * mu_weights) / total_mu if total_mu > 0 else 0
 print(f"  LT avg per CA (active): {lt_avg_ca:.4f}")
 print(f"  LT MU-wt per CA:       {lt_mu_ca:.4f}")
 print(f"  UCoMx LT:              76.583744")
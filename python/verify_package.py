@@ -5,7 +5,9 @@ Quick verification script for rtplan-complexity package
 Tests that the package is properly installed and functional.
 """
 
+import os
 import sys
+from functools import lru_cache
 
 
 def test_imports():
@@ -92,6 +94,44 @@ def test_optional_dependencies():
             print(f"○ {package} not installed - {purpose}")
 
 
+@lru_cache(maxsize=1)
+def _make_test_beam():
+    """Build the minimal 60-leaf static beam used by the functionality check."""
+    from rtplan_complexity.types import (
+        Beam, ControlPoint, MLCLeafPositions, JawPositions
+    )
+
+    cp = ControlPoint(
+        index=0,
+        gantry_angle=0.0,
+        gantry_rotation_direction="CW",
+        beam_limiting_device_angle=0.0,
+        cumulative_meterset_weight=1.0,
+        mlc_positions=MLCLeafPositions(
+            bank_a=[-10.0] * 60,
+            bank_b=[10.0] * 60,
+        ),
+        jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
+    )
+
+    return Beam(
+        beam_number=1,
+        beam_name="Test Beam",
+        beam_type="DYNAMIC",
+        radiation_type="PHOTON",
+        treatment_delivery_type="TREATMENT",
+        number_of_control_points=1,
+        control_points=[cp],
+        final_cumulative_meterset_weight=1.0,
+        beam_dose=100.0,
+        gantry_angle_start=0.0,
+        gantry_angle_end=0.0,
+        is_arc=False,
+        mlc_leaf_widths=[5.0] * 60,
+        number_of_leaves=60,
+    )
+
+
 def test_basic_functionality():
     """Test basic package functionality."""
     print("\n" + "="*60)
@@ -99,42 +139,9 @@ def test_basic_functionality():
     print("="*60)
     
     try:
-        from rtplan_complexity.types import (
-            Beam, ControlPoint, MLCLeafPositions,
-            JawPositions, RTPlan, Technique
-        )
         from rtplan_complexity.metrics import calculate_beam_metrics
         
-        # Create a minimal test beam
-        cp = ControlPoint(
-            index=0,
-            gantry_angle=0.0,
-            gantry_rotation_direction="CW",
-            beam_limiting_device_angle=0.0,
-            cumulative_meterset_weight=1.0,
-            mlc_positions=MLCLeafPositions(
-                bank_a=[-10.0] * 60,
-                bank_b=[10.0] * 60,
-            ),
-            jaw_positions=JawPositions(x1=-50, x2=50, y1=-50, y2=50),
-        )
-        
-        beam = Beam(
-            beam_number=1,
-            beam_name="Test Beam",
-            beam_type="DYNAMIC",
-            radiation_type="PHOTON",
-            treatment_delivery_type="TREATMENT",
-            number_of_control_points=1,
-            control_points=[cp],
-            final_cumulative_meterset_weight=1.0,
-            beam_dose=100.0,
-            gantry_angle_start=0.0,
-            gantry_angle_end=0.0,
-            is_arc=False,
-            mlc_leaf_widths=[5.0] * 60,
-            number_of_leaves=60,
-        )
+        beam = _make_test_beam()
         
         # Calculate metrics
         metrics = calculate_beam_metrics(beam)
@@ -156,8 +163,11 @@ def test_basic_functionality():
         
     except Exception as e:
         print(f"✗ Functionality test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get("RTPLAN_VERIFY_VERBOSE"):
+            import traceback
+            traceback.print_exc()
+        else:
+            print("  (set RTPLAN_VERIFY_VERBOSE=1 for the full traceback)")
         return False
 
 